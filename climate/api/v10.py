@@ -15,7 +15,6 @@
 
 from climate.openstack.common import log as logging
 from climate.service import api as service_api
-from climate.service import validation
 import climate.utils.api as api_utils
 
 LOG = logging.getLogger(__name__)
@@ -28,8 +27,14 @@ api = service_api.API()
 
 @rest.get('/leases')
 def leases_list():
-    """List all existing leases."""
-    return api_utils.render(leases=api.get_leases())
+    """List existing leases.
+
+    Supports limit, marker, sort_key, sort_dir, fields, tenant_id, user_id,
+    status, start_date and end_date query parameters. Users who are not
+    admins see only leases of their own tenant.
+    """
+    return api_utils.render(
+        leases=api.get_leases(api_utils.get_request_args()))
 
 
 @rest.post('/leases')
@@ -39,21 +44,18 @@ def leases_create(data):
 
 
 @rest.get('/leases/<lease_id>')
-@validation.check_exists(api.get_lease, lease_id='lease_id')
 def leases_get(lease_id):
     """Get lease by its ID."""
     return api_utils.render(lease=api.get_lease(lease_id))
 
 
 @rest.put('/leases/<lease_id>')
-@validation.check_exists(api.get_lease, lease_id='lease_id')
 def leases_update(lease_id, data):
     """Update lease. Only name changing and prolonging may be proceeded."""
     return api_utils.render(lease=api.update_lease(lease_id, data))
 
 
 @rest.delete('/leases/<lease_id>')
-@validation.check_exists(api.get_lease, lease_id='lease_id')
 def leases_delete(lease_id):
     """Delete specified lease."""
     api.delete_lease(lease_id)
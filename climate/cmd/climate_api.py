@@ -34,7 +34,9 @@ gettext.install('climate', unicode=1)
 
 from climate import config
 import climate.main as server
+from climate.openstack.common.deprecated import wsgi as common_wsgi
 from climate.openstack.common import log as logging
+from climate.openstack.common import service
 from climate.utils import service as service_utils
 
 
@@ -54,8 +56,19 @@ def main():
     logging.setup("climate")
     app = server.make_app()
 
-    wsgi.server(eventlet.listen((cfg.CONF.host, cfg.CONF.port), backlog=500),
-                app)
+    if cfg.CONF.api_workers:
+        # workers are forked with the listening socket opened here, the
+        # launcher respawns dead workers and passes SIGHUP to reload them
+        launcher = service.ProcessLauncher()
+        launcher.launch_service(
+            common_wsgi.Service(app, cfg.CONF.port, host=cfg.CONF.host,
+                                backlog=500),
+            workers=cfg.CONF.api_workers)
+        launcher.wait()
+    else:
+        wsgi.server(eventlet.listen((cfg.CONF.host, cfg.CONF.port),
+                                    backlog=500),
+                    app)
 
 
 if __name__ == '__main__':
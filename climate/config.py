@@ -41,7 +41,74 @@ manager_opts = [
     cfg.ListOpt('plugins',
                 default=['dummy.vm.plugin'],
                 help='All plugins to use (one for every resource type to '
-                     'support.)')
+                     'support.)'),
+    cfg.IntOpt('event_interval',
+               default=60,
+               help='Maximal interval in seconds between reloads of the '
+                    'pending events from DB, only events due within this '
+                    'interval are loaded. Events created through this '
+                    'manager are scheduled immediately.'),
+    cfg.IntOpt('event_batch_size',
+               default=100,
+               help='Maximum number of due events to take from DB on every '
+                    'check.'),
+    cfg.IntOpt('event_pool_size',
+               default=10,
+               help='Number of green threads used to run due events '
+                    'concurrently.'),
+    cfg.IntOpt('event_claim_timeout',
+               default=300,
+               help='Time in seconds after which an event in progress is '
+                    'considered abandoned by its manager and may be taken '
+                    'by another one.'),
+    cfg.IntOpt('reservation_pool_size',
+               default=20,
+               help='Maximal number of plugin actions for reservations of '
+                    'one lease called concurrently when the lease starts, '
+                    'ends or is deleted.'),
+    cfg.IntOpt('plugin_action_timeout',
+               default=3600,
+               help='Time in seconds to wait for a plugin action going on '
+                    'in background, 0 means no limit.'),
+    cfg.IntOpt('plugin_action_retries',
+               default=2,
+               help='Number of times a failed plugin action is retried.'),
+    cfg.IntOpt('plugin_action_retry_interval',
+               default=10,
+               help='Time in seconds between retries of a failed plugin '
+                    'action.')
+]
+
+api_opts = [
+    cfg.IntOpt('api_workers',
+               default=0,
+               help='Number of climate-api worker processes sharing the '
+                    'listening socket, 0 serves requests in the main '
+                    'process.'),
+    cfg.IntOpt('leases_list_limit',
+               default=1000,
+               help='Maximal number of leases returned in one list '
+                    'response.'),
+    cfg.BoolOpt('api_db_reads',
+                default=False,
+                help='Serve lease reads of climate-api straight from DB '
+                     'instead of asking climate-manager. The slave '
+                     'connection of the database section is used if it '
+                     'is set.'),
+    cfg.StrOpt('api_rpc_topic',
+               default='climate.api',
+               help='The topic climate-manager uses to tell climate-api '
+                    'about lease changes.'),
+    cfg.IntOpt('lease_cache_size',
+               default=0,
+               help='Maximal number of leases cached by climate-api, '
+                    '0 disables the cache.'),
+    cfg.IntOpt('lease_cache_ttl',
+               default=30,
+               help='Time in seconds lease is cached by climate-api. Cached '
+                    'leases are dropped as soon as climate-manager changes '
+                    'them, TTL only bounds the time a change notification '
+                    'lost on the way may leave a lease outdated.')
 ]
 
 os_opts = [
@@ -87,16 +154,42 @@ email_opts = [
                help='Email user to send notifications from.'),
     cfg.StrOpt('mail_user_password',
                default='climatenoreply',
-               help='Password for user to send notifications from.'),
+               help='Password for user to send notifications from, '
+                    'login is skipped if it is empty.'),
     cfg.StrOpt('mail_server',
                default='smtp.gmail.com',
-               help='SMTP server to use.')
+               help='SMTP server to use.'),
+    cfg.IntOpt('mail_port',
+               default=587,
+               help='Port of the SMTP server.'),
+    cfg.BoolOpt('mail_use_tls',
+                default=True,
+                help='Use STARTTLS to talk to the SMTP server. Disable it '
+                     'together with the empty mail_user_password to send '
+                     'to a local debugging SMTP server.'),
+    cfg.IntOpt('mail_batch_size',
+               default=100,
+               help='Maximal number of queued notifications sent at once, '
+                    'notifications to the same recipient are joined into '
+                    'one message.'),
+    cfg.IntOpt('mail_retries',
+               default=3,
+               help='Number of times sending of a message is retried.'),
+    cfg.IntOpt('mail_retry_interval',
+               default=5,
+               help='Time in seconds before the first retry of sending a '
+                    'message, it doubles on every following retry.'),
+    cfg.IntOpt('mail_idle_timeout',
+               default=60,
+               help='Time in seconds SMTP session is kept open while there '
+                    'is nothing to send.')
 ]
 
 
 CONF = cfg.CONF
 CONF.register_cli_opts(cli_opts)
 CONF.register_cli_opts(manager_opts)
+CONF.register_cli_opts(api_opts)
 CONF.register_cli_opts(os_opts)
 CONF.register_cli_opts(notification_opts)
 CONF.register_cli_opts(email_opts)
@@ -17,6 +17,7 @@ import eventlet
 from eventlet import corolocal
 
 from climate.openstack.common import log as logging
+from climate.utils.openstack import base
 
 
 LOG = logging.getLogger(__name__)
@@ -39,6 +40,18 @@ class Context(object):
         self.roles = roles
         self._db_session = None
 
+    @property
+    def service_catalog(self):
+        """Parsed service catalog, see base.ServiceCatalog."""
+        return self._service_catalog
+
+    @service_catalog.setter
+    def service_catalog(self, catalog):
+        if (catalog is not None and
+                not isinstance(catalog, base.ServiceCatalog)):
+            catalog = base.ServiceCatalog(catalog)
+        self._service_catalog = catalog
+
     def clone(self):
         return Context(self.user_id,
                        self.tenant_id,
@@ -55,7 +68,8 @@ class Context(object):
             'tenant_id': self.tenant_id,
             'tenant_name': self.tenant_name,
             'auth_token': self.auth_token,
-            'service_catalog': self.service_catalog,
+            'service_catalog': (self.service_catalog and
+                                self.service_catalog.to_json()),
             'roles': self.roles,
         }
 
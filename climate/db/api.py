@@ -106,6 +106,7 @@ def to_dict(func):
 
 #Reservation
 
+@to_dict
 def reservation_create(context, reservation_values):
     """Create a reservation from the values."""
     return IMPL.reservation_create(context, reservation_values)
@@ -114,7 +115,7 @@ def reservation_create(context, reservation_values):
 @to_dict
 def reservation_get_all_by_lease(context, lease_id):
     """Return all reservations belongs to specific lease."""
-    return IMPL.reservation_get_all_by_lease(context, lease_id)
+    return IMPL.reservation_get_all_by_lease_id(context, lease_id)
 
 
 @to_dict
@@ -128,15 +129,22 @@ def reservation_destroy(context, reservation_id):
     IMPL.reservation_destroy(context, reservation_id)
 
 
+@to_dict
 def reservation_update(context, reservation_id, reservation_values):
     """Update reservation."""
-    IMPL.reservation_update(context, reservation_id, reservation_values)
+    return IMPL.reservation_update(context, reservation_id, reservation_values)
+
+
+def reservation_update_all(context, reservation_ids, reservation_values):
+    """Update all listed reservations with one statement."""
+    IMPL.reservation_update_all(context, reservation_ids, reservation_values)
 
 
 #Lease
 
+@to_dict
 def lease_create(context, lease_values):
-    """Create a lease from values."""
+    """Create a lease with its reservations and events from values."""
     return IMPL.lease_create(context, lease_values)
 
 
@@ -159,15 +167,42 @@ def lease_get_all_by_user(context, user_id):
 
 
 @to_dict
-def lease_get(context, lease_id):
-    """Return lease."""
-    return IMPL.lease_get(context, lease_id)
+def lease_get(context, lease_id, use_slave=False):
+    """Return lease.
+
+    :param use_slave: read from the slave DB if it is configured.
+    """
+    return IMPL.lease_get(context, lease_id, use_slave)
 
 
-@to_dict
-def lease_list(context):
-    """Return a list of all existing leases."""
-    return IMPL.lease_list(context)
+def lease_list(context, filters=None, limit=None, marker=None,
+               sort_key='created_at', sort_dir='asc', fields=None,
+               use_slave=False):
+    """Return a page of leases sorted by sort_key.
+
+    :param filters: dict with 'tenant_id', 'user_id' and 'status' keys to
+                    select leases by these fields and 'start_date' and
+                    'end_date' keys to select leases overlapping the range.
+    :param marker: ID of the last lease of the previous page.
+    :param fields: names of lease fields to return, all fields are returned
+                   if not specified. Lease ID is always returned.
+    :param use_slave: read from the slave DB if it is configured.
+    """
+    leases = IMPL.lease_list(context, filters, limit, marker,
+                             sort_key, sort_dir, fields, use_slave)
+    leases = [lease.to_dict() for lease in leases]
+    if fields is not None:
+        fields = set(fields)
+        fields.add('id')
+        leases = [dict((key, value) for key, value in lease.iteritems()
+                       if key in fields)
+                  for lease in leases]
+    return leases
+
+
+def lease_refresh_status(context, lease_id):
+    """Update lease status according to the statuses of its events."""
+    IMPL.lease_refresh_status(context, lease_id)
 
 
 def lease_destroy(context, lease_id):
@@ -175,9 +210,15 @@ def lease_destroy(context, lease_id):
     IMPL.lease_destroy(context, lease_id)
 
 
+def lease_prolong(context, lease_id, seconds, event_types):
+    """Move lease end and lease events of event_types later by seconds."""
+    IMPL.lease_prolong(context, lease_id, seconds, event_types)
+
+
+@to_dict
 def lease_update(context, lease_id, lease_values):
     """Update lease or raise if not exists."""
-    IMPL.lease_update(context, lease_id, lease_values)
+    return IMPL.lease_update(context, lease_id, lease_values)
 
 
 #Events
@@ -201,10 +242,17 @@ def event_get(context, event_id):
 
 
 @to_dict
-def event_get_all_sorted_by_filters(context, sort_key, sort_dir, filters):
-    """Return instances sorted by param."""
+def event_get_all_sorted_by_filters(context, sort_key, sort_dir, filters,
+                                    limit=None, with_lease=False):
+    """Return instances sorted by param.
+
+    A 'time' filter selects only events planned not later than its value,
+    a 'claimed_at' one selects only events not claimed since its value.
+    If with_lease is True, fields of the event lease without reservations
+    and events are returned in the 'lease' key of every event.
+    """
     return IMPL.event_get_all_sorted_by_filters(context, sort_key, sort_dir,
-                                                filters)
+                                                filters, limit, with_lease)
 
 
 @to_dict
@@ -213,11 +261,25 @@ def event_list(context, param):
     return IMPL.event_list(context)
 
 
+def event_claim(context, event_id, owner, stale_before):
+    """Mark event IN_PROGRESS for owner if nobody else processes it.
+
+    Return True if the event was claimed.
+    """
+    return IMPL.event_claim(context, event_id, owner, stale_before)
+
+
+def event_heartbeat(context, owner):
+    """Prolong claims of all events in progress of the owner."""
+    return IMPL.event_heartbeat(context, owner)
+
+
 def event_destroy(context, event_id):
     """Delete event or raise if not exists."""
     IMPL.event_destroy(context, event_id)
 
 
+@to_dict
 def event_update(context, event_id, event_values):
     """Update event or raise if not exists."""
-    IMPL.event_update(context, event_id, event_values)
+    return IMPL.event_update(context, event_id, event_values)
@@ -32,10 +32,18 @@ def db_sync():
     print("Creating database: %s" % map_status(start_status))
 
 
+def db_upgrade():
+    upgrade_status = db_api.setup_db()
+    print("Upgrading database: %s" % map_status(upgrade_status))
+
+
 def add_command_parsers(subparsers):
     parser = subparsers.add_parser('db-sync')
     parser.set_defaults(func=db_sync)
 
+    parser = subparsers.add_parser('db-upgrade')
+    parser.set_defaults(func=db_upgrade)
+
 
 command_opt = cfg.SubCommandOpt('command',
                                 title='Command',
@@ -15,24 +15,38 @@
 
 """Implementation of SQLAlchemy backend."""
 
+import datetime
 import sys
 
+from oslo.config import cfg
 import sqlalchemy as sa
+from sqlalchemy.engine import reflection
 from sqlalchemy.sql.expression import asc
 from sqlalchemy.sql.expression import desc
 
 from climate.db.sqlalchemy import models
+from climate import exceptions
 from climate.openstack.common.db import exception as db_exc
 from climate.openstack.common.db.sqlalchemy import session as db_session
+from climate.openstack.common.db.sqlalchemy import utils as db_utils
 from climate.openstack.common import log as logging
+from climate.openstack.common import timeutils
 
 
 LOG = logging.getLogger(__name__)
+CONF = cfg.CONF
 
 get_engine = db_session.get_engine
 get_session = db_session.get_session
 
 
+def _get_read_session(use_slave):
+    """Return session reading from the slave DB if it is configured."""
+    if use_slave and CONF.database.slave_connection:
+        return get_session(slave_session=True)
+    return get_session()
+
+
 def get_backend():
     """The backend is this module itself."""
     return sys.modules[__name__]
@@ -44,18 +58,28 @@ def model_query(model, context, session=None, project_only=None):
     :param model: base model to query
     :param context: context to query under
     :param project_only: if present and context is user-type, then restrict
-            query to match the context's project_id.
+            query to match the context's tenant_id.
     """
     session = session or get_session()
 
     query = session.query(model)
 
-    if project_only:
-        query = query.filter_by(tenant_id=context.project_id)
+    if project_only and _is_user_context(context):
+        query = query.filter_by(tenant_id=context.tenant_id)
 
     return query
 
 
+def _is_user_context(context):
+    """Check the context belongs to a non-admin user of some tenant.
+
+    Climate internal context has no tenant and is not restricted.
+    """
+    if getattr(context, 'tenant_id', None) is None:
+        return False
+    return 'admin' not in (getattr(context, 'roles', None) or [])
+
+
 def column_query(context, *columns, **kwargs):
     session = kwargs.get("session") or get_session()
 
@@ -71,12 +95,65 @@ def setup_db():
     try:
         engine = db_session.get_engine(sqlite_fk=True)
         models.Lease.metadata.create_all(engine)
+        _upgrade_schema(engine)
+        _fill_leases_status(engine)
     except sa.exc.OperationalError as e:
         LOG.error("Database registration exception: %s", e)
         return False
     return True
 
 
+def _upgrade_schema(engine):
+    """Create columns and indexes added to the models after their tables.
+
+    create_all skips existing tables altogether, so new columns and indexes
+    of the tables created by the previous Climate versions have to be added
+    separately. New columns are always added as nullable ones.
+    """
+    inspector = reflection.Inspector.from_engine(engine)
+    for table in models.Lease.metadata.sorted_tables:
+        existing = set(column['name']
+                       for column in inspector.get_columns(table.name))
+        for column in table.columns:
+            if column.name not in existing:
+                LOG.info("Adding column %s to table %s",
+                         column.name, table.name)
+                engine.execute('ALTER TABLE %s ADD COLUMN %s %s' % (
+                    table.name, column.name,
+                    column.type.compile(dialect=engine.dialect)))
+
+        existing = set(index['name']
+                       for index in inspector.get_indexes(table.name))
+        for index in table.indexes:
+            if index.name not in existing:
+                LOG.info("Creating index %s on table %s",
+                         index.name, table.name)
+                index.create(engine)
+
+
+def _fill_leases_status(engine):
+    """Set status of the leases created before it was stored in DB."""
+    leases = models.Lease.__table__
+    engine.execute(leases.update().
+                   where(leases.c.status.is_(None)).
+                   values(status=_lease_status_from_events()))
+
+
+def _lease_status_from_events():
+    """Return SQL expression computing lease status from its events."""
+    leases = models.Lease.__table__
+    events = models.Event.__table__
+
+    def lease_events_exist(condition):
+        return sa.exists([events.c.id]).where(
+            sa.and_(events.c.lease_id == leases.c.id, condition))
+
+    return sa.case([(~lease_events_exist(events.c.status != 'DONE'), 'DONE'),
+                    (lease_events_exist(events.c.status == 'DONE'),
+                     'IN_PROGRESS')],
+                   else_='UNDONE')
+
+
 def drop_db():
     try:
         engine = db_session.get_engine(sqlite_fk=True)
@@ -164,7 +241,7 @@ def reservation_create(context, values):
             # raise exception about duplicated columns (e.columns)
             raise RuntimeError("DBDuplicateEntry: %s" % e.columns)
 
-    return reservation_get(context, reservation.id)
+    return reservation
 
 
 def reservation_update(context, reservation_id, values):
@@ -175,7 +252,16 @@ def reservation_update(context, reservation_id, values):
         reservation.update(values)
         reservation.save(session=session)
 
-    return reservation_get(context, reservation_id)
+    return reservation
+
+
+def reservation_update_all(context, reservation_ids, values):
+    session = get_session()
+
+    with session.begin():
+        query = model_query(models.Reservation, context, session)
+        query.filter(models.Reservation.id.in_(reservation_ids)).update(
+            values, synchronize_session=False)
 
 
 def reservation_destroy(context, reservation_id):
@@ -192,32 +278,81 @@ def reservation_destroy(context, reservation_id):
 
 #Lease
 def _lease_get(context, session, lease_id):
-    query = model_query(models.Lease, context, session)
+    query = model_query(models.Lease, context, session, project_only=True)
     return query.filter_by(id=lease_id).first()
 
 
-def lease_get(context, lease_id):
-    return _lease_get(context, get_session(), lease_id)
+def lease_get(context, lease_id, use_slave=False):
+    return _lease_get(context, _get_read_session(use_slave), lease_id)
 
 
 def lease_get_all(context):
-    query = model_query(models.Lease, context, get_session())
+    query = model_query(models.Lease, context, get_session(),
+                        project_only=True)
     return query.all()
 
 
 def lease_get_all_by_tenant(context, tenant_id):
-    raise NotImplementedError
+    query = model_query(models.Lease, context, get_session(),
+                        project_only=True)
+    return query.filter_by(tenant_id=tenant_id).all()
 
 
 def lease_get_all_by_user(context, user_id):
-    raise NotImplementedError
+    query = model_query(models.Lease, context, get_session(),
+                        project_only=True)
+    return query.filter_by(user_id=user_id).all()
+
 
+def lease_list(context, filters=None, limit=None, marker=None,
+               sort_key='created_at', sort_dir='asc', fields=None,
+               use_slave=False):
+    """Return a page of leases.
 
-def lease_list(context):
-    return model_query(models.Lease, context, get_session()).all()
+    Reservations and events are loaded only if they are listed in fields
+    or if fields are not specified.
+    """
+    session = _get_read_session(use_slave)
+    query = model_query(models.Lease, context, session, project_only=True)
+
+    for relation in ('reservations', 'events'):
+        if fields is not None and relation not in fields:
+            query = query.options(sa.orm.lazyload(relation))
+
+    filters = filters or {}
+    if 'tenant_id' in filters:
+        query = query.filter_by(tenant_id=filters['tenant_id'])
+    if 'user_id' in filters:
+        query = query.filter_by(user_id=filters['user_id'])
+    if 'status' in filters:
+        query = query.filter_by(status=filters['status'])
+    # date range selects leases overlapping it
+    if 'start_date' in filters:
+        query = query.filter(models.Lease.end_date >= filters['start_date'])
+    if 'end_date' in filters:
+        query = query.filter(models.Lease.start_date <= filters['end_date'])
+
+    marker_lease = None
+    if marker is not None:
+        marker_lease = _lease_get(context, session, marker)
+        if marker_lease is None:
+            raise exceptions.InvalidInput('Marker lease %s not found.' %
+                                          marker)
+
+    sort_keys = [sort_key]
+    if sort_key != 'id':
+        sort_keys.append('id')
+    query = db_utils.paginate_query(query, models.Lease, limit, sort_keys,
+                                    marker=marker_lease, sort_dir=sort_dir)
+    return query.all()
 
 
 def lease_create(context, values):
+    """Create lease with its reservations and events in one transaction.
+
+    Reservations and events are inserted with a single multi-row statement
+    per table.
+    """
     values = values.copy()
     lease = models.Lease()
     reservations = values.pop("reservations", [])
@@ -229,24 +364,30 @@ def lease_create(context, values):
         try:
             lease.save(session=session)
 
-            for r in reservations:
-                reservation = models.Reservation()
-                reservation.update({"lease_id": lease.id})
-                reservation.update(r)
-                reservation.save(session=session)
-
-            for e in events:
-                event = models.Event()
-                event.update({"lease_id": lease.id,
-                              "status": 'UNDONE'})
-                event.update(e)
-                event.save(session=session)
+            if reservations:
+                session.execute(
+                    models.Reservation.__table__.insert(),
+                    [{'lease_id': lease.id,
+                      'resource_id': r.get('resource_id'),
+                      'resource_type': r.get('resource_type'),
+                      'status': r.get('status')} for r in reservations])
+
+            if events:
+                session.execute(
+                    models.Event.__table__.insert(),
+                    [{'lease_id': lease.id,
+                      'event_type': e['event_type'],
+                      'time': e['time'],
+                      'status': e.get('status', 'UNDONE')} for e in events])
+
+            # load inserted reservations and events in the same transaction
+            session.refresh(lease)
 
         except db_exc.DBDuplicateEntry as e:
             # raise exception about duplicated columns (e.columns)
             raise RuntimeError("DBDuplicateEntry: %s" % e.columns)
 
-    return lease_get(context, lease.id)
+    return lease
 
 
 def lease_update(context, lease_id, values):
@@ -254,10 +395,62 @@ def lease_update(context, lease_id, values):
 
     with session.begin():
         lease = _lease_get(context, session, lease_id)
+        if not lease:
+            raise exceptions.LeaseNotFound(lease_id)
         lease.update(values)
         lease.save(session=session)
 
-    return lease_get(context, lease_id)
+    return lease
+
+
+def _datetime_add(session, column, seconds):
+    """Return SQL expression shifting the datetime column by seconds."""
+    dialect = session.bind.dialect.name
+    seconds = int(seconds)
+    if dialect == 'sqlite':
+        # datetime() drops fractional seconds, they are copied from the
+        # stored 'YYYY-MM-DD HH:MM:SS.ffffff' value
+        return sa.func.datetime(column, '%+d seconds' % seconds).op('||')(
+            sa.func.substr(column, 20))
+    if dialect == 'mysql':
+        return sa.func.date_add(
+            column, sa.literal_column('INTERVAL %d SECOND' % seconds))
+    return column + datetime.timedelta(seconds=seconds)
+
+
+def lease_prolong(context, lease_id, seconds, event_types):
+    """Shift lease end and its events of event_types by seconds."""
+    session = get_session()
+    with session.begin():
+        query = model_query(models.Lease, context, session, project_only=True)
+        updated = query.filter_by(id=lease_id).update(
+            {'end_date': _datetime_add(session, models.Lease.end_date,
+                                       seconds)},
+            synchronize_session=False)
+
+        if not updated:
+            raise exceptions.LeaseNotFound(lease_id)
+
+        query = model_query(models.Event, context, session)
+        query.filter(models.Event.lease_id == lease_id).filter(
+            models.Event.event_type.in_(event_types)).update(
+                {'time': _datetime_add(session, models.Event.time, seconds)},
+                synchronize_session=False)
+
+
+def lease_refresh_status(context, lease_id):
+    """Recompute stored lease status from the statuses of its events.
+
+    DELETE_FAILED status is kept until the lease is deleted.
+    """
+    session = get_session()
+    with session.begin():
+        query = model_query(models.Lease, context, session)
+        query = query.filter(sa.or_(models.Lease.status.is_(None),
+                                    models.Lease.status != 'DELETE_FAILED'))
+        query.filter_by(id=lease_id).update(
+            {'status': _lease_status_from_events()},
+            synchronize_session=False)
 
 
 def lease_destroy(context, lease_id):
@@ -266,8 +459,7 @@ def lease_destroy(context, lease_id):
         lease = _lease_get(context, session, lease_id)
 
         if not lease:
-            # raise not found error
-            raise RuntimeError("Lease not found!")
+            raise exceptions.LeaseNotFound(lease_id)
 
         session.delete(lease)
 
@@ -291,13 +483,27 @@ def event_get_all(context):
     return _event_get_all(context, get_session()).all()
 
 
-def event_get_all_sorted_by_filters(context, sort_key, sort_dir, filters):
+def event_get_all_sorted_by_filters(context, sort_key, sort_dir, filters,
+                                    limit=None, with_lease=False):
     """Return events filtered and sorted by name of the field."""
 
     sort_fn = {'desc': desc, 'asc': asc}
 
     events_query = _event_get_all(context, get_session())
 
+    if with_lease:
+        events_query = events_query.options(
+            sa.orm.joinedload('lease'),
+            sa.orm.lazyload('lease.reservations'),
+            sa.orm.lazyload('lease.events'))
+
+    if 'time' in filters:
+        events_query = events_query.filter(
+            models.Event.time <= filters['time'])
+    if 'claimed_at' in filters:
+        events_query = events_query.filter(sa.or_(
+            models.Event.claimed_at.is_(None),
+            models.Event.claimed_at <= filters['claimed_at']))
     if 'status' in filters:
         events_query = \
             events_query.filter(models.Event.status.in_(filters['status']))
@@ -313,6 +519,9 @@ def event_get_all_sorted_by_filters(context, sort_key, sort_dir, filters):
         sort_fn[sort_dir](getattr(models.Event, sort_key))
     )
 
+    if limit:
+        events_query = events_query.limit(limit)
+
     return events_query.all()
 
 
@@ -333,7 +542,7 @@ def event_create(context, values):
             # raise exception about duplicated columns (e.columns)
             raise RuntimeError("DBDuplicateEntry: %s" % e.columns)
 
-    return event_get(context, event.id)
+    return event
 
 
 def event_update(context, event_id, values):
@@ -344,7 +553,40 @@ def event_update(context, event_id, values):
         event.update(values)
         event.save(session=session)
 
-    return event_get(context, event_id)
+    return event
+
+
+def event_claim(context, event_id, owner, stale_before):
+    """Atomically mark the event IN_PROGRESS on behalf of the owner.
+
+    Only an UNDONE event or an IN_PROGRESS one whose owner has not sent
+    a heartbeat since stale_before may be claimed. Return True if the
+    claim succeeded.
+    """
+    session = get_session()
+    with session.begin():
+        query = model_query(models.Event, context, session)
+        query = query.filter(models.Event.id == event_id).filter(sa.or_(
+            models.Event.status == 'UNDONE',
+            sa.and_(models.Event.status == 'IN_PROGRESS',
+                    sa.or_(models.Event.claimed_at.is_(None),
+                           models.Event.claimed_at <= stale_before))))
+        claimed = query.update({'status': 'IN_PROGRESS',
+                                'owner': owner,
+                                'claimed_at': timeutils.utcnow()},
+                               synchronize_session=False)
+
+    return claimed == 1
+
+
+def event_heartbeat(context, owner):
+    """Prolong claims on all IN_PROGRESS events of the owner."""
+    session = get_session()
+    with session.begin():
+        query = model_query(models.Event, context, session)
+        query = query.filter_by(owner=owner, status='IN_PROGRESS')
+        return query.update({'claimed_at': timeutils.utcnow()},
+                            synchronize_session=False)
 
 
 def event_destroy(context, event_id):
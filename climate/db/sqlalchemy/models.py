@@ -14,6 +14,7 @@
 # limitations under the License.
 
 import sqlalchemy as sa
+from sqlalchemy.orm import attributes
 from sqlalchemy.orm import relationship
 
 from climate.db.sqlalchemy import model_base as mb
@@ -48,6 +49,10 @@ class Lease(mb.ClimateBase):
     start_date = sa.Column(sa.DateTime, nullable=False)
     end_date = sa.Column(sa.DateTime, nullable=False)
     trust_id = sa.Column(sa.String(36))
+    tenant_id = sa.Column(sa.String(255), index=True)
+    user_id = sa.Column(sa.String(255), index=True)
+    # UNDONE until the first event is done, DONE when all events are done
+    status = sa.Column(sa.String(13), index=True, default='UNDONE')
     reservations = relationship('Reservation', cascade="all,delete",
                                 backref='lease', lazy='joined')
     events = relationship('Event', cascade="all,delete",
@@ -55,22 +60,13 @@ class Lease(mb.ClimateBase):
 
     def to_dict(self):
         d = super(Lease, self).to_dict()
-        d['reservations'] = [r.to_dict() for r in self.reservations]
-        status = 'UNDONE'
-        all_done = True
-        d['events'] = []
-        for e in self.events:
-            e_dict = e.to_dict()
-            d['events'].append(e_dict)
-            if e_dict['status'] != 'DONE':
-                all_done = False
-            if e_dict['status'] == 'DONE':
-                status = 'IN_PROGRESS'
-
-        if all_done:
-            status = 'DONE'
-
-        d['status'] = status
+
+        # relations may be skipped by the query on purpose, do not load them
+        unloaded = attributes.instance_state(self).unloaded
+        if 'reservations' not in unloaded:
+            d['reservations'] = [r.to_dict() for r in self.reservations]
+        if 'events' not in unloaded:
+            d['events'] = [e.to_dict() for e in self.events]
         return d
 
 
@@ -101,6 +97,22 @@ class Event(mb.ClimateBase):
     event_type = sa.Column(sa.String(66))
     time = sa.Column(sa.DateTime)
     status = sa.Column(sa.String(13))
+    # manager processing the event and time of its last heartbeat
+    owner = sa.Column(sa.String(255))
+    claimed_at = sa.Column(sa.DateTime)
 
     def to_dict(self):
-        return super(Event, self).to_dict()
+        d = super(Event, self).to_dict()
+
+        # lease fields are added only if the lease was loaded with the event
+        if 'lease' not in attributes.instance_state(self).unloaded:
+            d['lease'] = super(Lease, self.lease).to_dict()
+        return d
+
+
+# Pending events are looked for by status and sorted by time, lease events
+# are looked for by lease and event type.
+sa.Index('events_status_time_idx',
+         Event.__table__.c.status, Event.__table__.c.time)
+sa.Index('events_lease_id_event_type_idx',
+         Event.__table__.c.lease_id, Event.__table__.c.event_type)
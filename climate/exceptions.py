@@ -35,7 +35,34 @@ class NotFoundException(ClimateException):
     value = None
 
     def __init__(self, value, message=None):
+        super(NotFoundException, self).__init__(value, message)
         self.code = "NOT_FOUND"
         self.value = value
         if message:
             self.message = message % value
+
+
+class LeaseNotFound(NotFoundException):
+    """Lease not found exception."""
+    message = "Lease %s not found"
+
+    def __init__(self, lease_id):
+        super(LeaseNotFound, self).__init__(lease_id, self.message)
+        # args are used to rebuild the exception passed through RPC
+        self.args = (lease_id,)
+
+
+class InvalidInput(ClimateException):
+    """Request parameters are not valid."""
+    message = "Invalid input"
+    code = "INVALID_INPUT"
+
+    def __init__(self, error):
+        super(InvalidInput, self).__init__(error)
+        self.message = error
+
+
+class ActionTimeoutException(ClimateException):
+    """Plugin action has not finished in time."""
+    message = "Plugin action timed out"
+    code = "ACTION_TIMEOUT"
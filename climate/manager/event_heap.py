@@ -0,0 +1,107 @@
+# Copyright (c) 2013 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import heapq
+
+import eventlet
+from eventlet import event as eventlet_event
+
+from climate.openstack.common import timeutils
+
+
+class EventHeap(object):
+    """Time ordered in-memory copy of the pending Climate events.
+
+    Climate DB stays the source of truth, the heap only tells the manager
+    when the next event is due. Entries are invalidated lazily: changing or
+    removing an event only updates the index, outdated heap items are
+    skipped when they reach the top.
+    """
+
+    def __init__(self):
+        self._heap = []
+        # event_id -> (time, lease_id)
+        self._entries = {}
+        self._wakeup = eventlet_event.Event()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self, events):
+        """Replace heap content with the passed events."""
+        self._entries = dict((e['id'], (e['time'], e['lease_id']))
+                             for e in events)
+        self._heap = [(time, event_id)
+                      for event_id, (time, _) in self._entries.iteritems()]
+        heapq.heapify(self._heap)
+        self._notify()
+
+    def push(self, event):
+        """Add the event or update its time if it is already known."""
+        next_time = self.next_time()
+        self._entries[event['id']] = (event['time'], event['lease_id'])
+        heapq.heappush(self._heap, (event['time'], event['id']))
+        if next_time is None or event['time'] < next_time:
+            self._notify()
+
+    def remove_lease(self, lease_id):
+        """Forget all events of the lease."""
+        for event_id, (_, event_lease_id) in self._entries.items():
+            if event_lease_id == lease_id:
+                del self._entries[event_id]
+
+    def next_time(self):
+        """Return the time of the nearest event or None if heap is empty."""
+        self._drop_outdated()
+        if self._heap:
+            return self._heap[0][0]
+        return None
+
+    def pop_due(self, now):
+        """Remove and return IDs of all events planned not later than now."""
+        due = []
+        self._drop_outdated()
+        while self._heap and self._heap[0][0] <= now:
+            _, event_id = heapq.heappop(self._heap)
+            del self._entries[event_id]
+            due.append(event_id)
+            self._drop_outdated()
+        return due
+
+    def wait(self, timeout):
+        """Sleep until the nearest event is due, but not longer than timeout.
+
+        Returns earlier if an event closer than the awaited one was pushed.
+        """
+        next_time = self.next_time()
+        if next_time is not None:
+            timeout = min(timeout, max(timeutils.delta_seconds(
+                timeutils.utcnow(), next_time), 0))
+        if timeout > 0:
+            with eventlet.Timeout(timeout, False):
+                self._wakeup.wait()
+        self._wakeup = eventlet_event.Event()
+
+    def _notify(self):
+        if not self._wakeup.ready():
+            self._wakeup.send()
+
+    def _drop_outdated(self):
+        while self._heap:
+            time, event_id = self._heap[0]
+            entry = self._entries.get(event_id)
+            if entry is not None and entry[0] == time:
+                break
+            heapq.heappop(self._heap)
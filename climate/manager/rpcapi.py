@@ -39,9 +39,16 @@ class ManagerRPCAPI(rpc_proxy.RpcProxy):
         return self.call(context, self.make_msg('get_lease',
                                                 lease_id=lease_id))
 
-    def list_leases(self, context):
-        """List all leases."""
-        return self.call(context, self.make_msg('list_leases'))
+    def list_leases(self, context, filters=None, limit=None, marker=None,
+                    sort_key='created_at', sort_dir='asc', fields=None):
+        """List a page of leases."""
+        return self.call(context, self.make_msg('list_leases',
+                                                filters=filters,
+                                                limit=limit,
+                                                marker=marker,
+                                                sort_key=sort_key,
+                                                sort_dir=sort_dir,
+                                                fields=fields))
 
     def create_lease(self, context, lease_values):
         """Create lease with specified parameters."""
@@ -56,5 +63,5 @@ class ManagerRPCAPI(rpc_proxy.RpcProxy):
 
     def delete_lease(self, context, lease_id):
         """Delete specified lease."""
-        return self.cast(context, self.make_msg('delete_lease',
+        return self.call(context, self.make_msg('delete_lease',
                                                 lease_id=lease_id))
@@ -14,7 +14,13 @@
 # limitations under the License.
 
 import datetime
+import functools
+import inspect
+import os
+import time
 
+import eventlet
+from eventlet import greenpool
 from oslo.config import cfg
 from stevedore import extension
 
@@ -22,8 +28,12 @@ from climate import config
 from climate import context
 from climate.db import api as db_api
 from climate import exceptions
+from climate.manager import event_heap
 from climate.openstack.common import log as logging
 from climate.openstack.common.rpc import service as rpc_service
+from climate.openstack.common import timeutils
+from climate.plugins import base
+from climate.service import rpcapi as service_rpcapi
 from climate.utils.openstack import keystone
 
 CONF = cfg.CONF
@@ -50,10 +60,102 @@ class ManagerService(rpc_service.Service):
         self.resource_actions = self._setup_actions()
         self._setup_methods()
         self._setup_notifications()
+        self.event_pool = greenpool.GreenPool(CONF.event_pool_size)
+        # IDs of the events being processed by this manager
+        self.running_events = set()
+        # lease ID -> events of the lease waiting for its running events
+        self.lease_events = {}
+        self.event_heap = event_heap.EventHeap()
+        self.event_owner = '%s:%s' % (host, os.getpid())
+        self.service_rpcapi = service_rpcapi.ServiceRPCAPI()
 
     def start(self):
         super(ManagerService, self).start()
-        self.tg.add_timer(10, self._event)
+        self.tg.add_thread(self._fill_lease_owners)
+        self.tg.add_thread(self._event_loop)
+        self.tg.add_timer(max(CONF.event_claim_timeout // 3, 1),
+                          self._event_heartbeat)
+
+    def _fill_lease_owners(self):
+        """Sets tenant and user of leases created before they were stored.
+
+        Users see only leases of their tenant, so the leases without tenant
+        are visible to admins only. Their owner is taken from the trust the
+        lease was created with.
+        """
+        # tenant_id=None selects leases with NULL tenant_id
+        leases = db_api.lease_get_all_by_tenant(self.internal_context, None)
+        for lease in leases:
+            if not lease['trust_id']:
+                LOG.warning('Lease %s has no trust, it is visible to admins '
+                            'only.', lease['id'])
+                continue
+            try:
+                tenant_id, user_id = keystone.get_trust_owner(
+                    lease['trust_id'])
+                db_api.lease_update(self.internal_context, lease['id'],
+                                    {'tenant_id': tenant_id,
+                                     'user_id': user_id})
+            except Exception:
+                LOG.exception('Failed to get owner of lease %s from its '
+                              'trust, it is visible to admins only.',
+                              lease['id'])
+            else:
+                self._lease_changed(lease['id'])
+
+    def _load_events(self, now):
+        """Fill events heap with pending events due before the next reload.
+
+        Only the nearest event_batch_size events due within event_interval
+        are loaded, events created or changed through this manager are
+        pushed to the heap as they are written. Returns the time of the
+        next reload.
+        """
+        next_load = now + datetime.timedelta(seconds=CONF.event_interval)
+        events = db_api.event_get_all_sorted_by_filters(
+            self.internal_context,
+            sort_key='time',
+            sort_dir='asc',
+            filters={'status': ['UNDONE'], 'time': next_load},
+            limit=CONF.event_batch_size
+        )
+        self.event_heap.load(events)
+        LOG.debug('%s pending events loaded from DB.', len(events))
+        if len(events) >= CONF.event_batch_size:
+            # events after the last loaded one are not known yet
+            next_load = max(events[-1]['time'], now)
+        return next_load
+
+    def _schedule_lease_events(self, lease):
+        """Put pending events of the lease to the events heap."""
+        for event in lease['events']:
+            if event['status'] == 'UNDONE':
+                self.event_heap.push(event)
+
+    def _event_loop(self):
+        """Sleeps until the nearest event is due and commits due events.
+
+        Pending events due soon are reloaded from DB every event_interval
+        seconds to catch the ones not created through this manager.
+        """
+        next_load = None
+        while True:
+            try:
+                now = timeutils.utcnow()
+                if next_load is None or next_load <= now:
+                    next_load = self._load_events(now)
+                    self._reclaim_events()
+
+                if self.event_heap.pop_due(now):
+                    self._dispatch_due_events()
+            except Exception:
+                LOG.exception('Error occurred while events dispatching.')
+
+            timeout = CONF.event_interval
+            if next_load is not None:
+                timeout = min(timeout, max(timeutils.delta_seconds(
+                    timeutils.utcnow(), next_load), 1))
+            self.event_heap.wait(timeout)
 
     def _get_plugins(self):
         """Return dict of resource-plugin class pairs."""
@@ -88,7 +190,9 @@ class ManagerService(rpc_service.Service):
             on_end = delete
 
         Waking up and deleting are the default actions to commit for every
-        resource type.
+        resource type. Actions are kept as functions taking the list of
+        resource IDs, bulk <action>_many methods of plugins are used if they
+        exist.
         """
         actions = {}
 
@@ -104,7 +208,7 @@ class ManagerService(rpc_service.Service):
 
             for action_time in conf_section:
                 action_name = conf_section[action_time]
-                action_func = getattr(plugin, action_name, None)
+                action_func = self._get_bulk_action(plugin, action_name)
                 if action_func is None:
                     raise exceptions.ClimateException(
                         'No action %s implemented in plugin %s' %
@@ -115,14 +219,15 @@ class ManagerService(rpc_service.Service):
                 actions[resource_type][action_time] = action_func
 
             if 'on_start' not in actions[resource_type]:
-                default_on_start_fn = getattr(plugin, 'wake_up', None)
+                default_on_start_fn = self._get_bulk_action(plugin,
+                                                            'wake_up')
                 if default_on_start_fn is None:
                     raise NotImplementedError("Default on start method is "
                                               "not implemented in plugin %s" %
                                               plugin.name)
                 actions[resource_type]['on_start'] = default_on_start_fn
             if 'on_end' not in actions[resource_type]:
-                default_on_end_fn = getattr(plugin, 'delete', None)
+                default_on_end_fn = self._get_bulk_action(plugin, 'delete')
                 if default_on_end_fn is None:
                     raise NotImplementedError("Default on end method is "
                                               "not implemented in plugin %s" %
@@ -131,10 +236,25 @@ class ManagerService(rpc_service.Service):
 
         return actions
 
+    @staticmethod
+    def _get_bulk_action(plugin, action_name):
+        """Return function running plugin action for a list of resources."""
+        bulk_action = getattr(plugin, '%s_many' % action_name, None)
+        if bulk_action is not None:
+            return bulk_action
+        action = getattr(plugin, action_name, None)
+        if action is None:
+            return None
+        return functools.partial(plugin.run_many, action)
+
     def _setup_methods(self):
         """Setup additional methods.
         Format:
             module:method
+
+        Methods used as event handlers are called with the lease ID and the
+        event time. Those also accepting a 'lease' keyword argument get the
+        lease fields loaded together with the event in it, or None.
         """
         for parameter in CONF.additional_methods:
             module_method = parameter.split(':')
@@ -149,54 +269,211 @@ class ManagerService(rpc_service.Service):
                 )
 
     def _setup_notifications(self):
+        """Setup all installed notifiers.
+
+        Every notifier sends notifications at its own pace limited by the
+        rate_limit option of the section named after the notifier:
+
+        [email.notifier]
+            rate_limit = 10
+        """
         notification_manager = extension.ExtensionManager(
             namespace='climate.notification.plugins',
             invoke_on_load=True
         )
-        self.notifier = notification_manager.extensions[0].obj
+        self.notifiers = []
+        for notifier_extension in notification_manager.extensions:
+            notifier = notifier_extension.obj
+            CONF.register_opts(
+                [cfg.FloatOpt('rate_limit', default=0,
+                              help='Maximal number of notifications sent '
+                                   'per second, 0 means no limit.')],
+                group=notifier.name)
+            notifier.rate_limit = CONF.get(notifier.name).rate_limit
+            self.notifiers.append(notifier)
 
     def _event(self):
-        """Tries to commit event.
+        """Tries to commit due events.
 
-        If there is an event in Climate DB to be done, do it and change its
-        status to 'DONE'.
+        Takes all events from Climate DB that should be already done and
+        starts them in background, they change their status to 'DONE' when
+        finished. Returns the number of due events taken from DB, so the
+        caller knows whether more of them may be left.
         """
-        LOG.debug('Trying to get event from DB.')
+        LOG.debug('Trying to get due events from DB.')
         events = db_api.event_get_all_sorted_by_filters(
             self.internal_context,
             sort_key='time',
             sort_dir='asc',
-            filters={'status': ['UNDONE']}
+            filters={'status': ['UNDONE'], 'time': timeutils.utcnow()},
+            limit=CONF.event_batch_size,
+            with_lease=True
         )
+        self._start_events(events)
+        return len(events)
 
-        if not events:
-            return
+    def _dispatch_due_events(self):
+        """Starts all due events batch by batch until DB runs out of them."""
+        while self._event() >= CONF.event_batch_size:
+            pass
 
-        event = events[0]
-
-        if event['time'] < datetime.datetime.utcnow():
-            db_api.event_update(self.internal_context,
-                                event['id'], {'status': 'IN_PROGRESS'})
+    def _reclaim_events(self):
+        """Retakes events abandoned IN_PROGRESS by stopped managers."""
+        events = db_api.event_get_all_sorted_by_filters(
+            self.internal_context,
+            sort_key='time',
+            sort_dir='asc',
+            filters={'status': ['IN_PROGRESS'],
+                     'claimed_at': self._claim_stale_before()},
+            limit=CONF.event_batch_size,
+            with_lease=True
+        )
+        if events:
+            LOG.warning('Retaking %s abandoned events.', len(events))
+        self._start_events(events)
+
+    def _start_events(self, events):
+        """Claims events not started yet and runs them in background.
+
+        Events are claimed before returning, so they are IN_PROGRESS and the
+        next query for due events does not return them again. Events claimed
+        by another manager are skipped. The events loop does not wait for
+        the events to finish, so slow events do not delay the following
+        ones. Returns the number of events started.
+        """
+        stale_before = self._claim_stale_before()
+        claimed = []
+        for event in events:
+            if event['id'] in self.running_events:
+                continue
+            if db_api.event_claim(self.internal_context, event['id'],
+                                  self.event_owner, stale_before):
+                claimed.append(event)
+            else:
+                LOG.debug('Event %s is processed by another manager.',
+                          event['id'])
+        events = claimed
+        if events:
+            self.running_events.update(event['id'] for event in events)
+            eventlet.spawn_n(self._run_events, events)
+        return len(events)
+
+    def _run_events(self, events):
+        """Runs events concurrently and logs throughput and lag.
+
+        Events of one lease are run one by one in time order, so start and
+        end of a lease due at once do not race. Events of a lease whose
+        events are already running are queued after them.
+        """
+        now = timeutils.utcnow()
+        threads = []
+        for event in sorted(events, key=lambda event: event['time']):
+            lease_events = self.lease_events.get(event['lease_id'])
+            if lease_events is not None:
+                lease_events.append(event)
+            else:
+                self.lease_events[event['lease_id']] = [event]
+                threads.append(self.event_pool.spawn(self._run_lease_events,
+                                                     event['lease_id']))
+        for thread in threads:
+            thread.wait()
+
+        elapsed = timeutils.delta_seconds(now, timeutils.utcnow())
+        LOG.info('%(count)s events processed in %(elapsed).3f seconds '
+                 '(%(rate).2f events/s), maximal lag is %(lag).3f seconds.',
+                 {'count': len(events),
+                  'elapsed': elapsed,
+                  'rate': len(events) / max(elapsed, 0.001),
+                  'lag': timeutils.delta_seconds(events[0]['time'], now)})
+
+    def _run_lease_events(self, lease_id):
+        """Runs queued events of the lease one by one."""
+        lease_events = self.lease_events[lease_id]
+        try:
+            while lease_events:
+                event = lease_events.pop(0)
+                try:
+                    self._process_event(event)
+                except Exception:
+                    LOG.exception('Error occurred while event processing.')
+                finally:
+                    self.running_events.discard(event['id'])
+        finally:
+            del self.lease_events[lease_id]
+
+    def _claim_stale_before(self):
+        return timeutils.utcnow() - datetime.timedelta(
+            seconds=CONF.event_claim_timeout)
+
+    def _event_heartbeat(self):
+        """Keeps claims on the events being processed by this manager."""
+        db_api.event_heartbeat(self.internal_context, self.event_owner)
+
+    def _process_event(self, event):
+        """Runs the event claimed by this manager and saves its status.
+
+        Lease fields loaded together with the event are passed to the event
+        handler to not read the lease again.
+        """
+        try:
             event_type = event['event_type']
             event_fn = getattr(self, event_type, None)
             if event_fn is None:
                 raise exceptions.ClimateException('Event type %s is not '
                                                   'supported' % event_type)
-            try:
+            if self._accepts_lease(event_fn):
+                event_fn(event['lease_id'], event['time'],
+                         lease=event.get('lease'))
+            else:
                 event_fn(event['lease_id'], event['time'])
-            except Exception:
-                db_api.event_update(self.internal_context,
-                                    event['id'], {'status': 'ERROR'})
-                LOG.exception('Error occurred while event handling.')
-
+        except Exception:
+            db_api.event_update(self.internal_context,
+                                event['id'], {'status': 'ERROR'})
+            LOG.exception('Error occurred while event handling.')
+        else:
             db_api.event_update(self.internal_context,
                                 event['id'], {'status': 'DONE'})
+            db_api.lease_refresh_status(self.internal_context,
+                                        event['lease_id'])
+        self._lease_changed(event['lease_id'])
 
-    def get_lease(self, ctx, lease_id):
-        return db_api.lease_get(ctx, lease_id)
+    @staticmethod
+    def _accepts_lease(event_fn):
+        """Check if the event handler takes the 'lease' keyword argument.
 
-    def list_leases(self, ctx):
-        return db_api.lease_list(ctx)
+        Handlers set up from additional_methods may have the older
+        (lease_id, event_time) signature.
+        """
+        try:
+            args, _, keywords, _ = inspect.getargspec(event_fn)
+        except TypeError:
+            return False
+        return keywords is not None or 'lease' in args
+
+    def _lease_changed(self, lease_id):
+        """Tells climate-api processes to drop the lease from caches."""
+        try:
+            self.service_rpcapi.lease_changed(self.internal_context,
+                                              lease_id)
+        except Exception:
+            LOG.exception('Failed to send change of lease %s.', lease_id)
+
+    def get_lease(self, ctx, lease_id):
+        lease = db_api.lease_get(ctx, lease_id)
+        if lease is None:
+            raise exceptions.LeaseNotFound(lease_id)
+        return lease
+
+    def list_leases(self, ctx, filters=None, limit=None, marker=None,
+                    sort_key='created_at', sort_dir='asc', fields=None):
+        filters = filters or {}
+        for date_filter in ('start_date', 'end_date'):
+            if date_filter in filters:
+                filters[date_filter] = datetime.datetime.strptime(
+                    filters[date_filter], "%Y-%m-%d %H:%M")
+
+        return db_api.lease_list(ctx, filters, limit, marker,
+                                 sort_key, sort_dir, fields)
 
     def create_lease(self, ctx, lease_values):
         start_date = lease_values['start_date']
@@ -211,18 +488,11 @@ class ManagerService(rpc_service.Service):
 
         lease_values['start_date'] = start_date
         lease_values['end_date'] = end_date
+        lease_values['tenant_id'] = ctx.tenant_id
+        lease_values['user_id'] = ctx.user_id
 
-        lease = db_api.lease_create(ctx, lease_values)
-
-        db_api.event_create(ctx, {'lease_id': lease['id'],
-                                  'event_type': 'start_lease',
-                                  'time': lease['start_date'],
-                                  'status': 'UNDONE'})
-
-        db_api.event_create(ctx, {'lease_id': lease['id'],
-                                  'event_type': 'end_lease',
-                                  'time': lease['end_date'],
-                                  'status': 'UNDONE'})
+        events = [{'event_type': 'start_lease', 'time': start_date},
+                  {'event_type': 'end_lease', 'time': end_date}]
 
         for notification_time in CONF.notifications:
 
@@ -241,81 +511,192 @@ class ManagerService(rpc_service.Service):
             )
 
             if notification_time.startswith('+'):
-                event_time = lease['start_date'] + time_delta
+                event_time = start_date + time_delta
             else:
-                event_time = lease['end_date'] - time_delta
+                event_time = end_date - time_delta
 
-            db_api.event_create(ctx, {'lease_id': lease['id'],
-                                      'event_type': 'notify',
-                                      'time': event_time,
-                                      'status': 'UNDONE'})
+            events.append({'event_type': 'notify', 'time': event_time})
 
-        return db_api.lease_get(ctx, lease['id'])
+        lease_values['events'] = events
+        lease = db_api.lease_create(ctx, lease_values)
+        self._schedule_lease_events(lease)
+        return lease
 
     def update_lease(self, ctx, lease_id, values):
         # prolong_for variable will be in seconds. Climate client provides
         # flags to set days, hours, etc.
         prolong_for = values.pop('prolong_for', None)
         if prolong_for:
-            lease_events = db_api.event_get_all_sorted_by_filters(
-                ctx,
-                sort_key='time',
-                sort_dir='asc',
-                filters={'lease_id': lease_id, 'event_type': ['end_lease',
-                                                              'notify']}
-            )
-
-            end_date = self.get_lease(ctx, lease_id)['end_date']
-            prolong_delta = datetime.timedelta(seconds=int(prolong_for))
-            new_end_time = end_date + prolong_delta
-            values['end_date'] = new_end_time
-
-            for event in lease_events:
-                event_date = event['time']
-                new_event_time = event_date + prolong_delta
-
-                db_api.event_update(ctx, event['id'],
-                                    {'time': new_event_time})
+            db_api.lease_prolong(ctx, lease_id, int(prolong_for),
+                                 ['end_lease', 'notify'])
 
         if values:
-            db_api.lease_update(ctx, lease_id, values)
-        return db_api.lease_get(ctx, lease_id)
+            lease = db_api.lease_update(ctx, lease_id, values)
+        else:
+            lease = self.get_lease(ctx, lease_id)
+        if prolong_for:
+            self._schedule_lease_events(lease)
+        self._lease_changed(lease_id)
+        return lease
 
     def delete_lease(self, ctx, lease_id):
+        """Checks the lease exists and deletes it in background."""
         lease = self.get_lease(ctx, lease_id)
-        keystone.create_ctx_from_trust(lease['trust_id'])
-        for reservation in lease['reservations']:
-            self.plugins[reservation['resource_type']]\
-                .delete(reservation['resource_id'], context.current())
-        db_api.lease_destroy(ctx, lease_id)
-
-    def start_lease(self, lease_id, event_time):
-        self._basic_action(lease_id, 'on_start', 'active')
-
-    def end_lease(self, lease_id, event_time):
-        self._basic_action(lease_id, 'on_end', 'deleted')
-
-    def notify(self, lease_id, event_time):
-        lease = self.get_lease(self.internal_context, lease_id)
-        self.notifier.notify(CONF.notify_to, 'Climate Notification',
-                             'Lease %s with id %s expires in %s.' %
-                             (lease['name'],
-                              lease_id,
-                              lease['end_date'] - event_time))
-
-    def _basic_action(self, lease_id, action_time, reservation_status=None):
-        """Commits basic lease actions such as starting and ending."""
-        lease = self.get_lease(self.internal_context, lease_id)
-        keystone.create_ctx_from_trust(lease['trust_id'])
+        eventlet.spawn_n(self._delete_lease, ctx, lease)
 
-        for reservation in lease['reservations']:
-            resource_type = reservation['resource_type']
-            self.resource_actions[resource_type][action_time](
-                reservation['resource_id'],
-                context.current()
-            )
+    def _delete_lease(self, ctx, lease):
+        """Deletes resources of the lease and then the lease itself.
+
+        If deletion fails, the lease is left in DELETE_FAILED status, so
+        users see it was not deleted and may delete it again.
+        """
+        try:
+            keystone.create_ctx_from_trust(lease['trust_id'])
+            failures = self._run_reservations_action(
+                lease['reservations'],
+                lambda resource_type: self.plugins[resource_type].delete_many)
+            if failures:
+                LOG.error('Lease %s is not deleted, resources of reservations '
+                          '%s were not deleted.',
+                          lease['id'], ', '.join(failures))
+                db_api.lease_update(self.internal_context, lease['id'],
+                                    {'status': 'DELETE_FAILED'})
+            else:
+                db_api.lease_destroy(ctx, lease['id'])
+                self.event_heap.remove_lease(lease['id'])
+        except Exception:
+            LOG.exception('Failed to delete lease %s.', lease['id'])
+            try:
+                db_api.lease_update(self.internal_context, lease['id'],
+                                    {'status': 'DELETE_FAILED'})
+            except Exception:
+                LOG.exception('Failed to mark lease %s DELETE_FAILED.',
+                              lease['id'])
+        self._lease_changed(lease['id'])
+
+    def start_lease(self, lease_id, event_time, lease=None):
+        self._basic_action(lease_id, 'on_start', 'active', lease)
+
+    def end_lease(self, lease_id, event_time, lease=None):
+        self._basic_action(lease_id, 'on_end', 'deleted', lease)
 
-            if reservation_status is not None:
-                db_api.reservation_update(self.internal_context,
-                                          reservation['id'],
-                                          {'status': reservation_status})
+    def notify(self, lease_id, event_time, lease=None):
+        """Passes notification to all notifiers.
+
+        Notifiers only queue it, so a slow notifier does not delay others.
+        """
+        if lease is None:
+            lease = self.get_lease(self.internal_context, lease_id)
+        text = ('Lease %s with id %s expires in %s.' %
+                (lease['name'], lease_id, lease['end_date'] - event_time))
+        for notifier in self.notifiers:
+            notifier.notify(CONF.notify_to, 'Climate Notification', text)
+
+    def _basic_action(self, lease_id, action_time, reservation_status=None,
+                      lease=None):
+        """Commits basic lease actions such as starting and ending.
+
+        :param lease: lease fields if they are already loaded, reservations
+                      are loaded separately then.
+        """
+        if lease is None:
+            lease = self.get_lease(self.internal_context, lease_id)
+            reservations = lease['reservations']
+        else:
+            reservations = db_api.reservation_get_all_by_lease(
+                self.internal_context, lease_id)
+        keystone.create_ctx_from_trust(lease['trust_id'])
+
+        failures = self._run_reservations_action(
+            reservations,
+            lambda resource_type: self.resource_actions[resource_type][
+                action_time])
+
+        if reservation_status is not None:
+            succeeded = [reservation['id']
+                         for reservation in reservations
+                         if reservation['id'] not in failures]
+            if succeeded:
+                db_api.reservation_update_all(self.internal_context,
+                                              succeeded,
+                                              {'status': reservation_status})
+            if failures:
+                db_api.reservation_update_all(self.internal_context,
+                                              failures.keys(),
+                                              {'status': 'error'})
+
+        if failures:
+            raise exceptions.ClimateException(
+                'Action %s failed for reservations %s.' %
+                (action_time, ', '.join(failures)))
+
+    def _run_reservations_action(self, reservations, get_action):
+        """Runs action for reservations grouped by resource type.
+
+        Every group is passed to one bulk call of the plugin. Actions
+        returning plugins.base.ActionHandle go on in background and do not
+        hold back other actions. Failed actions are retried.
+
+        :param get_action: function returning bulk action to run for the
+                           resource type.
+        :return: dict of exceptions raised by the actions by reservation ID.
+        """
+        ctx = context.current()
+        groups = {}
+        for reservation in reservations:
+            groups.setdefault(reservation['resource_type'], []).append(
+                reservation)
+        failures = {}
+
+        def run_group(resource_type, group):
+            action = get_action(resource_type)
+            for attempt in xrange(CONF.plugin_action_retries + 1):
+                if attempt:
+                    eventlet.sleep(CONF.plugin_action_retry_interval)
+                    LOG.warning('Retrying action for reservations %s.',
+                                ', '.join(r['id'] for r in group))
+                group_failures = self._run_bulk_action(action, group, ctx)
+                group = [reservation for reservation in group
+                         if reservation['id'] in group_failures]
+                if not group:
+                    return
+            failures.update(group_failures)
+
+        threads = [eventlet.spawn(run_group, resource_type, group)
+                   for resource_type, group in groups.iteritems()]
+        for thread in threads:
+            thread.wait()
+
+        return failures
+
+    def _run_bulk_action(self, action, reservations, ctx):
+        """Runs bulk action once and waits for its results.
+
+        :return: dict of exceptions raised by the action by reservation ID.
+        """
+        try:
+            results = action([reservation['resource_id']
+                              for reservation in reservations], ctx)
+        except Exception as e:
+            LOG.exception('Error occurred while running action for '
+                          'reservations %s.',
+                          ', '.join(r['id'] for r in reservations))
+            return dict((reservation['id'], e)
+                        for reservation in reservations)
+
+        deadline = time.time() + CONF.plugin_action_timeout
+        failures = {}
+        for reservation in reservations:
+            result = results.get(reservation['resource_id'])
+            if not isinstance(result, base.ActionHandle):
+                continue
+            try:
+                if CONF.plugin_action_timeout:
+                    result.wait(max(deadline - time.time(), 0.001))
+                else:
+                    result.wait()
+            except Exception as e:
+                LOG.exception('Error occurred while running action for '
+                              'reservation %s.', reservation['id'])
+                failures[reservation['id']] = e
+        return failures
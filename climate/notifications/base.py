@@ -14,13 +14,81 @@
 # limitations under the License.
 
 import abc
+import time
+
+import eventlet
+from eventlet import queue
+
+from climate.openstack.common import log as logging
+
+LOG = logging.getLogger(__name__)
 
 
 class BaseNotifier(object):
-    """Base class to implement notification plugin."""
+    """Base class to implement notification plugin.
+
+    notify() only queues the notification. Every notifier has its own green
+    thread passing queued notifications to send() in batches not faster
+    than rate_limit notifications per second, so a slow notifier does not
+    hold back the others.
+    """
     __metaclass__ = abc.ABCMeta
 
     name = 'base_notifier'
 
+    # maximal number of notifications sent per second, 0 means no limit
+    rate_limit = 0
+    # maximal number of notifications passed to send() at once
+    batch_size = 100
+    # time in seconds the sender waits for new notifications before close()
+    idle_timeout = 60
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._sender = None
+
     def notify(self, to, subject, text):
-        raise NotImplementedError
\ No newline at end of file
+        """Queue notification, it is sent later in background."""
+        self._queue.put((to, subject, text))
+        if self._sender is None:
+            self._sender = eventlet.spawn(self._send_loop)
+
+    @abc.abstractmethod
+    def send(self, notifications):
+        """Deliver the list of (to, subject, text) notifications."""
+
+    def close(self):
+        """Free resources kept while there are notifications to send."""
+
+    def _send_loop(self):
+        batch_size = self.batch_size
+        if self.rate_limit:
+            batch_size = min(batch_size, max(int(self.rate_limit), 1))
+
+        try:
+            while True:
+                try:
+                    notifications = [self._queue.get(
+                        timeout=self.idle_timeout)]
+                except queue.Empty:
+                    break
+                while (len(notifications) < batch_size and
+                       not self._queue.empty()):
+                    notifications.append(self._queue.get_nowait())
+
+                started = time.time()
+                try:
+                    self.send(notifications)
+                except Exception:
+                    LOG.exception('Notifier %s failed to send %s '
+                                  'notifications.', self.name,
+                                  len(notifications))
+                if self.rate_limit:
+                    eventlet.sleep(max(
+                        len(notifications) / float(self.rate_limit) -
+                        (time.time() - started), 0))
+        finally:
+            self.close()
+            self._sender = None
+            if not self._queue.empty():
+                self._sender = eventlet.spawn(self._send_loop)
@@ -14,6 +14,9 @@
 # limitations under the License.
 
 import smtplib
+import socket
+
+import eventlet
 from oslo.config import cfg
 
 from email.MIMEMultipart import MIMEMultipart
@@ -21,16 +24,50 @@ from email.MIMEBase import MIMEBase
 from email.MIMEText import MIMEText
 
 from climate.notifications import base
+from climate.openstack.common import log as logging
 
 CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
 
 
 class EmailNotifier(base.BaseNotifier):
+    """Sends notifications by email.
+
+    One SMTP session is kept open while there is something to send.
+    Notifications of a batch to the same recipient are joined into one
+    message.
+    """
 
     def __init__(self):
+        super(EmailNotifier, self).__init__()
         self.name = 'email.notifier'
+        self.batch_size = CONF.mail_batch_size
+        self.idle_timeout = CONF.mail_idle_timeout
+        self._server = None
+
+    def send(self, notifications):
+        for to, subject, text in self._join(notifications):
+            self._send(to, subject, text)
+
+    def close(self):
+        self._disconnect()
 
-    def notify(self, to, subject, text):
+    @staticmethod
+    def _join(notifications):
+        """Join notifications to the same recipient into one message."""
+        by_recipient = {}
+        for to, subject, text in notifications:
+            by_recipient.setdefault(to, []).append((subject, text))
+
+        for to, messages in by_recipient.iteritems():
+            subjects = set(subject for subject, _ in messages)
+            if len(subjects) == 1:
+                subject = subjects.pop()
+            else:
+                subject = 'Climate Notifications'
+            yield to, subject, '\n\n'.join(text for _, text in messages)
+
+    def _send(self, to, subject, text):
         msg = MIMEMultipart()
 
         msg['From'] = CONF.mail_user
@@ -39,10 +76,36 @@ class EmailNotifier(base.BaseNotifier):
 
         msg.attach(MIMEText(text))
 
-        mailServer = smtplib.SMTP(CONF.mail_server, 587)
-        mailServer.ehlo()
-        mailServer.starttls()
-        mailServer.ehlo()
-        mailServer.login(CONF.mail_user, CONF.mail_user_password)
-        mailServer.sendmail(CONF.mail_user, to, msg.as_string())
-        mailServer.close()
+        for attempt in xrange(CONF.mail_retries + 1):
+            if attempt:
+                eventlet.sleep(CONF.mail_retry_interval * 2 ** (attempt - 1))
+            try:
+                self._connect().sendmail(CONF.mail_user, to,
+                                         msg.as_string())
+                return
+            except (smtplib.SMTPException, socket.error):
+                LOG.exception('Failed to send notification to %s, '
+                              'attempt %s.', to, attempt + 1)
+                self._disconnect()
+        LOG.error('Notification to %s was not sent: %s', to, text)
+
+    def _connect(self):
+        if self._server is None:
+            server = smtplib.SMTP(CONF.mail_server, CONF.mail_port)
+            server.ehlo()
+            if CONF.mail_use_tls:
+                server.starttls()
+                server.ehlo()
+            if CONF.mail_user_password:
+                server.login(CONF.mail_user, CONF.mail_user_password)
+            self._server = server
+        return self._server
+
+    def _disconnect(self):
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, socket.error):
+            pass
+        self._server = None
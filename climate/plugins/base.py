@@ -15,13 +15,18 @@
 
 import abc
 
+import eventlet
+from eventlet import event as eventlet_event
+from eventlet import greenpool
 from oslo.config import cfg
 
+from climate import exceptions
 from climate.openstack.common import log as logging
 from climate.utils import resources
 
 LOG = logging.getLogger(__name__)
 CONF = cfg.CONF
+CONF.import_opt('reservation_pool_size', 'climate.config')
 
 
 def required(fun):
@@ -37,6 +42,60 @@ def optional(fun):
     return fun
 
 
+class ActionHandle(object):
+    """Result of a plugin action going on in background.
+
+    Actions may return a handle instead of blocking until they are done.
+    The plugin completes the handle with succeed() or fail() and the
+    manager waits for it.
+    """
+
+    def __init__(self):
+        self._done = eventlet_event.Event()
+
+    @classmethod
+    def spawn(cls, func, *args, **kwargs):
+        """Run func in a green thread and return the handle of its result."""
+        handle = cls()
+        eventlet.spawn_n(handle.run, func, *args, **kwargs)
+        return handle
+
+    def run(self, func, *args, **kwargs):
+        """Run func and complete the handle with its result.
+
+        If func returns a handle itself, its result is awaited.
+        """
+        try:
+            result = func(*args, **kwargs)
+            if isinstance(result, ActionHandle):
+                result = result.wait()
+        except Exception as e:
+            self.fail(e)
+        else:
+            self.succeed(result)
+
+    def ready(self):
+        return self._done.ready()
+
+    def succeed(self, result=None):
+        self._done.send(result)
+
+    def fail(self, exc):
+        self._done.send_exception(exc)
+
+    def wait(self, timeout=None):
+        """Return the action result or raise the action exception.
+
+        ActionTimeoutException is raised if the action is not done in
+        timeout seconds.
+        """
+        if not timeout:
+            return self._done.wait()
+        with eventlet.Timeout(timeout, False):
+            return self._done.wait()
+        raise exceptions.ActionTimeoutException()
+
+
 class BasePlugin(resources.BaseResource):
     __metaclass__ = abc.ABCMeta
 
@@ -95,10 +154,44 @@ class BasePlugin(resources.BaseResource):
 
     @required
     def delete(self, resource_id, ctx):
-        """Delete resource."""
+        """Delete resource.
+
+        Long actions may return ActionHandle instead of blocking.
+        """
         pass
 
     @required
     def wake_up(self, resource_id, ctx):
-        """Wake up resource."""
+        """Wake up resource.
+
+        Long actions may return ActionHandle instead of blocking.
+        """
         pass
+
+    @required_with_default
+    def delete_many(self, resource_ids, ctx):
+        """Delete resources.
+
+        Return dict of results by resource ID, results may be ActionHandle.
+        """
+        return self.run_many(self.delete, resource_ids, ctx)
+
+    @required_with_default
+    def wake_up_many(self, resource_ids, ctx):
+        """Wake up resources.
+
+        Return dict of results by resource ID, results may be ActionHandle.
+        """
+        return self.run_many(self.wake_up, resource_ids, ctx)
+
+    def run_many(self, action, resource_ids, ctx):
+        """Run single resource action for every resource concurrently.
+
+        Return dict of ActionHandle by resource ID.
+        """
+        pool = greenpool.GreenPool(CONF.reservation_pool_size)
+        handles = {}
+        for resource_id in resource_ids:
+            handles[resource_id] = ActionHandle()
+            pool.spawn_n(handles[resource_id].run, action, resource_id, ctx)
+        return handles
@@ -14,7 +14,9 @@
 # limitations under the License.
 
 import eventlet
+from eventlet import event as eventlet_event
 from novaclient import exceptions as nova_exceptions
+from oslo.config import cfg
 
 from climate.openstack.common import log as logging
 from climate.plugins import base
@@ -22,12 +24,174 @@ from climate.utils.openstack import nova
 
 LOG = logging.getLogger(__name__)
 
+opts = [
+    cfg.IntOpt('vm_teardown_poll_interval',
+               default=2,
+               help='Initial interval in seconds between checks of the '
+                    'instances being snapshotted before deletion.'),
+    cfg.IntOpt('vm_teardown_poll_max_interval',
+               default=30,
+               help='Maximal interval in seconds between checks of the '
+                    'instances being snapshotted before deletion.'),
+]
+
+CONF = cfg.CONF
+CONF.register_cli_opts(opts)
+
+# Instance metadata key keeping the teardown progress
+TEARDOWN_KEY = 'climate_teardown'
+SNAPSHOT_REQUESTED = 'snapshot_requested'
+# Image metadata key keeping ID of the instance the snapshot is made of
+SNAPSHOT_OF_KEY = 'climate_snapshot_of'
+
+SNAPSHOT_TASK_STATES = ('IMAGE_SNAPSHOT', 'IMAGE_PENDING_UPLOAD',
+                        'IMAGE_UPLOADING')
+
+
+class VMTeardown(object):
+    """Snapshots and deletes instances checking all of them at once.
+
+    Every instance goes through the following steps:
+
+        request snapshot -> wait for the snapshot -> delete
+
+    The step reached is kept in the instance metadata, so a teardown
+    interrupted by the manager restart goes on from the same step when the
+    end_lease event is retaken. Snapshots are created with the instance ID
+    in their metadata, so no second snapshot is made even if the manager
+    stopped before the instance metadata was updated.
+
+    Instances are checked by a single green thread with one Nova request
+    per token. The interval between checks grows while nothing changes.
+    """
+
+    def __init__(self):
+        # instance_id -> (ctx, handle completed when teardown is over)
+        self._pending = {}
+        self._wakeup = eventlet_event.Event()
+        self._poller = None
+
+    def delete(self, instance_id, ctx):
+        """Start snapshot and deletion of the instance.
+
+        Return base.ActionHandle completed when the instance is deleted.
+        """
+        if instance_id in self._pending:
+            return self._pending[instance_id][1]
+
+        handle = base.ActionHandle()
+        self._pending[instance_id] = (ctx, handle)
+        if self._poller is None:
+            self._poller = eventlet.spawn(self._poll)
+        elif not self._wakeup.ready():
+            self._wakeup.send()
+        return handle
+
+    def _poll(self):
+        interval = CONF.vm_teardown_poll_interval
+        try:
+            while self._pending:
+                if self._check():
+                    interval = CONF.vm_teardown_poll_interval
+                else:
+                    interval = min(interval * 2,
+                                   CONF.vm_teardown_poll_max_interval)
+                if self._pending:
+                    with eventlet.Timeout(interval, False):
+                        self._wakeup.wait()
+                    self._wakeup = eventlet_event.Event()
+        finally:
+            self._poller = None
+
+    def _check(self):
+        """Move every pending instance forward, return True on any progress.
+
+        New instances are always reported as progress to check them again
+        soon after their snapshot is requested.
+        """
+        by_token = {}
+        for instance_id, (ctx, _) in self._pending.items():
+            by_token.setdefault(ctx.auth_token, (ctx, []))[1].append(
+                instance_id)
+
+        progress = False
+        for ctx, instance_ids in by_token.itervalues():
+            try:
+                servers = nova.get_many(instance_ids, ctx)
+                snapshots = {}
+                if any(server.metadata.get(TEARDOWN_KEY) != SNAPSHOT_REQUESTED
+                       for server in servers.itervalues()):
+                    snapshots = nova.get_images_by_meta(SNAPSHOT_OF_KEY, ctx)
+            except Exception as e:
+                LOG.exception('Failed to get instances %s from Nova.',
+                              ', '.join(instance_ids))
+                for instance_id in instance_ids:
+                    self._finish(instance_id, e)
+                progress = True
+                continue
+
+            for instance_id in instance_ids:
+                try:
+                    progress |= self._step(instance_id,
+                                           servers.get(instance_id), ctx,
+                                           instance_id in snapshots)
+                except nova_exceptions.NotFound:
+                    self._step(instance_id, None, ctx)
+                    progress = True
+                except Exception as e:
+                    self._finish(instance_id, e)
+                    progress = True
+        return progress
+
+    def _step(self, instance_id, server, ctx, snapshot_exists=False):
+        """Do the next teardown step, False means the instance is busy."""
+        if server is None:
+            LOG.warning('Instance %s has been already deleted.', instance_id)
+            self._finish(instance_id)
+            return True
+
+        task_state = getattr(server, 'OS-EXT-STS:task_state', None)
+        if task_state is not None:
+            if task_state.upper() not in SNAPSHOT_TASK_STATES:
+                LOG.warning('Nova reported unexpected task status %s for '
+                            'instance %s.', task_state, instance_id)
+            return False
+
+        if server.metadata.get(TEARDOWN_KEY) != SNAPSHOT_REQUESTED:
+            if snapshot_exists:
+                LOG.info('Snapshot of instance %s already exists.',
+                         instance_id)
+            else:
+                try:
+                    nova.create_image(instance_id, ctx, server.name,
+                                      {SNAPSHOT_OF_KEY: instance_id})
+                except Exception:
+                    # snapshot can not be made of a RESERVED instance,
+                    # it is deleted right away then
+                    LOG.warning('Snapshot of instance %s was not created.',
+                                instance_id)
+            nova.set_meta(instance_id, {TEARDOWN_KEY: SNAPSHOT_REQUESTED},
+                          ctx)
+            return True
+
+        nova.delete(instance_id, ctx)
+        self._finish(instance_id)
+        return True
+
+    def _finish(self, instance_id, exc=None):
+        _, handle = self._pending.pop(instance_id)
+        if exc is None:
+            handle.succeed()
+        else:
+            handle.fail(exc)
+
 
 class VMPlugin(base.BasePlugin):
     """Base plugin for VM reservation."""
     def __init__(self):
         self.name = 'basic.vm.plugin'
         self.resource_type = 'virtual:instance'
+        self.teardown = VMTeardown()
 
     def get_title(self):
         return "Basic VM Plugin"
@@ -43,30 +207,8 @@ class VMPlugin(base.BasePlugin):
         nova.wake_up(resource_id, ctx)
 
     def delete(self, resource_id, ctx):
-        try:
-            try:
-                # we'll catch exaption if we're trying to create image
-                # from RESERVED instance
-                nova.create_image(resource_id, ctx)
-            except Exception:
-                pass
-            eventlet.sleep(5)
-            while not self.check_active(resource_id, ctx):
-                eventlet.sleep(1)
-            nova.delete(resource_id, ctx)
-        except nova_exceptions.NotFound:
-            LOG.warning('Instance %s has been already deleted.' %
-                        resource_id)
-
-    def check_active(self, resource_id, ctx):
-        instance = nova.get(resource_id, ctx)
-        task_state = getattr(instance, "OS-EXT-STS:task_state")
-        if task_state is None:
-            return True
+        return self.teardown.delete(resource_id, ctx)
 
-        if task_state.upper() in ['IMAGE_SNAPSHOT', 'IMAGE_PENDING_UPLOAD',
-                                  'IMAGE_UPLOADING']:
-            return False
-        else:
-            LOG.error('Nova reported unexpected task status %s for '
-                      'instance %s' % (task_state, resource_id))
+    def delete_many(self, resource_ids, ctx):
+        return dict((resource_id, self.teardown.delete(resource_id, ctx))
+                    for resource_id in resource_ids)
@@ -40,3 +40,13 @@ class DummyVMPlugin(base.BasePlugin):
     def delete(self, resource_id, ctx):
         """Dummy VM plugin does nothing."""
         return 'VM %s should be deleted this moment.' % resource_id
+
+    def wake_up_many(self, resource_ids, ctx):
+        """Dummy VM plugin does nothing."""
+        return dict((resource_id, self.wake_up(resource_id, ctx))
+                    for resource_id in resource_ids)
+
+    def delete_many(self, resource_ids, ctx):
+        """Dummy VM plugin does nothing."""
+        return dict((resource_id, self.delete(resource_id, ctx))
+                    for resource_id in resource_ids)
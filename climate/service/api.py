@@ -13,22 +13,139 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import datetime
+
+from oslo.config import cfg
+
 from climate import context
+from climate.db import api as db_api
 from climate import exceptions
 from climate.manager import rpcapi as manager_rpcapi
 from climate.openstack.common import log as logging
+from climate.openstack.common import rpc
+from climate.openstack.common.rpc import dispatcher as rpc_dispatcher
 from climate.service import trusts
+from climate.utils import cache
 
+CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
+LEASE_SORT_KEYS = ('created_at', 'id', 'name', 'start_date', 'end_date',
+                   'status')
+
+
+class LeaseCache(object):
+    """Leases cached by climate-api.
+
+    climate-manager fanout casts lease_changed when a lease, its
+    reservations or events change, the cached lease is dropped then.
+    """
+
+    RPC_API_VERSION = '1.0'
+
+    def __init__(self):
+        self._leases = cache.LRUCache(CONF.lease_cache_size,
+                                      CONF.lease_cache_ttl)
+        self._conn = rpc.create_connection(new=True)
+        dispatcher = rpc_dispatcher.RpcDispatcher([self])
+        self._conn.create_consumer(CONF.api_rpc_topic, dispatcher,
+                                   fanout=True)
+        self._conn.consume_in_thread()
+
+    def get(self, ctx, lease_id):
+        """Return cached lease if it is visible in the context or None."""
+        lease = self._leases.get(lease_id)
+        if lease is None:
+            return None
+        if ('admin' not in (ctx.roles or []) and ctx.tenant_id and
+                lease.get('tenant_id') != ctx.tenant_id):
+            raise exceptions.LeaseNotFound(lease_id)
+        return lease
+
+    def set(self, lease):
+        self._leases.set(lease['id'], lease)
+
+    def pop(self, lease_id):
+        self._leases.pop(lease_id)
+
+    def lease_changed(self, ctx, lease_id):
+        self.pop(lease_id)
+
 
 class API(object):
     def __init__(self):
         self.manager_rpcapi = manager_rpcapi.ManagerRPCAPI()
+        self._lease_cache = None
 
-    def get_leases(self):
-        """List all existing leases."""
-        return self.manager_rpcapi.list_leases(context.ctx())
+    @property
+    def lease_cache(self):
+        """Return LeaseCache or None if caching is disabled.
+
+        The cache is created on first use, after the config is parsed.
+        """
+        if self._lease_cache is None and CONF.lease_cache_size > 0:
+            self._lease_cache = LeaseCache()
+        return self._lease_cache
+
+    def get_leases(self, query=None):
+        """List existing leases page by page.
+
+        :param query: Listing parameters: limit, marker, sort_key, sort_dir,
+                      comma separated fields, tenant_id, user_id, status
+                      and start_date/end_date range.
+        :type query: dict
+        """
+        query = query or {}
+
+        try:
+            limit = int(query.get('limit', CONF.leases_list_limit))
+        except ValueError:
+            raise exceptions.InvalidInput('Limit should be an integer.')
+        limit = min(max(limit, 0), CONF.leases_list_limit)
+
+        sort_key = query.get('sort_key', 'created_at')
+        if sort_key not in LEASE_SORT_KEYS:
+            raise exceptions.InvalidInput('Leases can be sorted only by '
+                                          '%s.' % ', '.join(LEASE_SORT_KEYS))
+        sort_dir = query.get('sort_dir', 'asc')
+        if sort_dir not in ('asc', 'desc'):
+            raise exceptions.InvalidInput('Sort direction should be asc or '
+                                          'desc.')
+
+        filters = {}
+        for field_filter in ('tenant_id', 'user_id', 'status'):
+            if field_filter in query:
+                filters[field_filter] = query[field_filter]
+        for date_filter in ('start_date', 'end_date'):
+            if date_filter in query:
+                try:
+                    datetime.datetime.strptime(query[date_filter],
+                                               "%Y-%m-%d %H:%M")
+                except ValueError:
+                    raise exceptions.InvalidInput(
+                        'Dates should be in YYYY-MM-DD HH:MM format.')
+                filters[date_filter] = query[date_filter]
+
+        fields = query.get('fields')
+        if fields is not None:
+            fields = [field for field in fields.split(',') if field]
+
+        if CONF.api_db_reads:
+            for date_filter in ('start_date', 'end_date'):
+                if date_filter in filters:
+                    filters[date_filter] = datetime.datetime.strptime(
+                        filters[date_filter], "%Y-%m-%d %H:%M")
+            return db_api.lease_list(context.ctx(), filters, limit,
+                                     query.get('marker'), sort_key,
+                                     sort_dir, fields, use_slave=True)
+
+        return self.manager_rpcapi.list_leases(context.ctx(),
+                                               filters=filters,
+                                               limit=limit,
+                                               marker=query.get('marker'),
+                                               sort_key=sort_key,
+                                               sort_dir=sort_dir,
+                                               fields=fields)
 
     def create_lease(self, data):
         """Create new lease.
@@ -48,7 +165,25 @@ class API(object):
         :param lease_id: ID of the lease in Climate DB.
         :type lease_id: str
         """
-        return self.manager_rpcapi.get_lease(context.ctx(), lease_id)
+        ctx = context.ctx()
+        lease_cache = self.lease_cache
+        if lease_cache is None:
+            return self._get_lease(ctx, lease_id)
+
+        lease = lease_cache.get(ctx, lease_id)
+        if lease is None:
+            lease = self._get_lease(ctx, lease_id)
+            lease_cache.set(lease)
+        return lease
+
+    def _get_lease(self, ctx, lease_id):
+        if not CONF.api_db_reads:
+            return self.manager_rpcapi.get_lease(ctx, lease_id)
+
+        lease = db_api.lease_get(ctx, lease_id, use_slave=True)
+        if lease is None:
+            raise exceptions.LeaseNotFound(lease_id)
+        return lease
 
     def update_lease(self, lease_id, data):
         """Update lease. Only name changing and prolonging may be proceeded.
@@ -68,6 +203,8 @@ class API(object):
             data['name'] = new_name
         if prolong:
             data['prolong_for'] = prolong
+        if self.lease_cache is not None:
+            self.lease_cache.pop(lease_id)
         return self.manager_rpcapi.update_lease(context.ctx(),
                                                 lease_id,
                                                 data)
@@ -78,6 +215,8 @@ class API(object):
         :param lease_id: ID of the lease in Climate DB.
         :type lease_id: str
         """
+        if self.lease_cache is not None:
+            self.lease_cache.pop(lease_id)
         self.manager_rpcapi.delete_lease(context.ctx(), lease_id)
 
     def get_plugins(self):
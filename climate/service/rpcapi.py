@@ -0,0 +1,40 @@
+# Copyright (c) 2013 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from oslo.config import cfg
+
+import climate.openstack.common.rpc.proxy as rpc_proxy
+
+CONF = cfg.CONF
+
+
+class ServiceRPCAPI(rpc_proxy.RpcProxy):
+    """Client side for the RPC API of climate-api processes.
+
+    Used by climate-manager to tell all API processes about lease changes.
+    """
+    BASE_RPC_API_VERSION = '1.0'
+
+    def __init__(self):
+        """Initiate RPC API client with needed topic and RPC version."""
+        super(ServiceRPCAPI, self).__init__(
+            topic=CONF.api_rpc_topic,
+            default_version=self.BASE_RPC_API_VERSION
+        )
+
+    def lease_changed(self, context, lease_id):
+        """Tell API processes that the lease or its parts have changed."""
+        self.fanout_cast(context, self.make_msg('lease_changed',
+                                                lease_id=lease_id))
@@ -22,6 +22,7 @@ from climate import context
 from climate import exceptions as ex
 from climate.openstack.common.deprecated import wsgi
 from climate.openstack.common import log as logging
+from climate.utils import serializer
 
 LOG = logging.getLogger(__name__)
 
@@ -85,6 +86,8 @@ class Rest(flask.Blueprint):
 
                 try:
                     return func(**kwargs)
+                except ex.NotFoundException as e:
+                    return not_found(e)
                 except ex.ClimateException as e:
                     return bad_request(e)
                 except Exception as e:
@@ -139,14 +142,12 @@ def render(result=None, response_type=None, status=None, **kwargs):
     if not response_type:
         response_type = RT_JSON
 
-    serializer = None
     if "application/json" in response_type:
         response_type = RT_JSON
-        serializer = wsgi.JSONDictSerializer()
     else:
         abort_and_log(400, "Content type '%s' isn't supported" % response_type)
 
-    body = serializer.serialize(result)
+    body = serializer.dumps(result)
     response_type = str(response_type)
 
     return flask.Response(response=body, status=status_code,
@@ -0,0 +1,93 @@
+# Copyright (c) 2013 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+# indexes of the linked list node fields
+_PREV, _NEXT, _KEY, _EXPIRES, _VALUE = range(5)
+
+
+class LRUCache(object):
+    """Size bounded in-memory cache with expiring entries.
+
+    The least recently used entry is evicted when the cache is full.
+    Entries are kept in a circular doubly linked list ordered from the least
+    to the most recently used one.
+    """
+
+    def __init__(self, size, ttl):
+        """Create cache.
+
+        :param size: maximal number of entries.
+        :param ttl: default entry lifetime in seconds.
+        """
+        self.size = size
+        self.ttl = ttl
+        # key -> [prev node, next node, key, expiration time, value]
+        self._data = {}
+        self._root = []
+        self._root[:] = [self._root, self._root, None, None, None]
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """Return cached value or default if it is missing or expired."""
+        node = self._data.get(key)
+        if node is None:
+            return default
+        self._unlink(node)
+        if node[_EXPIRES] <= time.time():
+            del self._data[key]
+            return default
+
+        # move the entry to the most recently used end
+        self._append(node)
+        return node[_VALUE]
+
+    def set(self, key, value, ttl=None):
+        """Cache value for ttl seconds, default cache ttl is used if None."""
+        if self.size <= 0:
+            return
+        if ttl is None:
+            ttl = self.ttl
+        self.pop(key)
+        while len(self._data) >= self.size:
+            self.pop(self._root[_NEXT][_KEY])
+        node = [None, None, key, time.time() + ttl, value]
+        self._append(node)
+        self._data[key] = node
+
+    def pop(self, key):
+        """Remove the entry if it is cached."""
+        node = self._data.pop(key, None)
+        if node is not None:
+            self._unlink(node)
+
+    def clear(self):
+        self._data.clear()
+        self._root[:] = [self._root, self._root, None, None, None]
+
+    def _append(self, node):
+        last = self._root[_PREV]
+        node[_PREV] = last
+        node[_NEXT] = self._root
+        last[_NEXT] = node
+        self._root[_PREV] = node
+
+    @staticmethod
+    def _unlink(node):
+        node[_PREV][_NEXT] = node[_NEXT]
+        node[_NEXT][_PREV] = node[_PREV]
@@ -16,34 +16,75 @@
 import json
 
 
+class ServiceCatalog(object):
+    """Service catalog indexed by service type, interface and region.
+
+    Catalog is parsed and indexed on the first lookup only, so it may be
+    created from JSON strings that are never used. Both Keystone v3
+    ('interface' and 'url' keys) and v2 ('publicURL' like keys) endpoints
+    are supported. Empty catalog, for example from an empty header, is
+    treated as an empty list.
+    """
+
+    def __init__(self, catalog):
+        if catalog and isinstance(catalog, basestring):
+            self._json = catalog
+            self._catalog = None
+        else:
+            self._json = None
+            self._catalog = catalog or []
+        self._urls = None
+
+    def url_for(self, service_type, interface='public', region=None):
+        """Return endpoint URL or None if there is no such endpoint.
+
+        The first endpoint of the interface is used if region is None.
+        """
+        if self._urls is None:
+            self._urls = self._index()
+        return self._urls.get((service_type, interface, region))
+
+    def to_primitive(self):
+        """Return catalog in the form Keystone returned it."""
+        if self._catalog is None:
+            self._catalog = json.loads(self._json)
+        return self._catalog
+
+    def to_json(self):
+        """Return JSON string to pass catalog through RPC or headers."""
+        if self._json is None:
+            self._json = json.dumps(self._catalog)
+        return self._json
+
+    def _index(self):
+        urls = {}
+        for service in self.to_primitive():
+            for endpoint in service.get('endpoints', []):
+                if 'interface' in endpoint:
+                    interfaces = {endpoint['interface']: endpoint['url']}
+                else:
+                    interfaces = dict(
+                        (key[:-3], url) for key, url in endpoint.iteritems()
+                        if key.endswith('URL'))
+                for interface, url in interfaces.iteritems():
+                    for region in (endpoint.get('region'), None):
+                        urls.setdefault((service['type'], interface, region),
+                                        url)
+        return urls
+
+
 def url_for(service_catalog, service_type, admin=False,
-            endpoint_interface=None):
+            endpoint_interface=None, region=None):
     """Gets url of the service to communicate throught."""
     if not endpoint_interface:
         endpoint_interface = 'public'
     if admin:
         endpoint_interface = 'admin'
 
-    service = _get_service_from_catalog(service_catalog, service_type)
-
-    if service:
-        endpoints = service['endpoints']
-        try:
-            endpoint = [e for e in endpoints
-                        if e['interface'] == endpoint_interface][0]
-            return endpoint['url']
-        except KeyError:
-            return endpoints[0]['%sURL' % endpoint_interface]
-    else:
-        raise Exception('Service "%s" not found' % service_type)
-
-
-def _get_service_from_catalog(catalog, service_type):
-    """Parses JSON catalog string and returns info about needed service."""
-    if catalog:
-        catalog = json.loads(catalog)
-        for service in catalog:
-            if service['type'] == service_type:
-                return service
+    if not isinstance(service_catalog, ServiceCatalog):
+        service_catalog = ServiceCatalog(service_catalog)
 
-    return None
+    url = service_catalog.url_for(service_type, endpoint_interface, region)
+    if url is None:
+        raise Exception('Service "%s" not found' % service_type)
+    return url
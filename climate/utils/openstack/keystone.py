@@ -13,24 +13,40 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
-
 from keystoneclient.v3 import client as keystone_client_v3
 from oslo.config import cfg
 
 from climate import context
+from climate.openstack.common import timeutils
+from climate.utils import cache
 from climate.utils.openstack import base
 
 
 opts = [
     cfg.StrOpt('identity_service',
                default='identityv3',
-               help='Identity service to use.')
+               help='Identity service to use.'),
+    cfg.IntOpt('trust_token_cache_size',
+               default=1000,
+               help='Maximal number of trust tokens kept for reuse.'),
+    cfg.IntOpt('trust_token_refresh_margin',
+               default=300,
+               help='Trust tokens are not reused when they expire in less '
+                    'than this number of seconds.')
 ]
 
 CONF = cfg.CONF
 CONF.register_cli_opts(opts)
 
+_TRUST_CONTEXTS = None
+
+
+def _trust_contexts():
+    global _TRUST_CONTEXTS
+    if _TRUST_CONTEXTS is None:
+        _TRUST_CONTEXTS = cache.LRUCache(CONF.trust_token_cache_size, 0)
+    return _TRUST_CONTEXTS
+
 
 def client(username=None, password=None, trust_id=None, auth_url=None,
            tenant=None, ctx=None):
@@ -52,6 +68,27 @@ def client(username=None, password=None, trust_id=None, auth_url=None,
 
 
 def create_ctx_from_trust(trust_id):
+    """Set context authenticated by the trust as the current one.
+
+    Tokens are reused until they are about to expire, so Keystone is asked
+    for a new one at most once per trust token lifetime.
+    """
+    ctx = _trust_contexts().get(trust_id)
+    if ctx is None:
+        ctx = _authenticate_by_trust(trust_id)
+    context.set_ctx(ctx.clone())
+
+
+def get_trust_owner(trust_id):
+    """Return tenant ID and user ID of the trustor of the trust."""
+    _, keystone_client = _trust_client(trust_id)
+    auth_ref = keystone_client.auth_ref
+    trustor = auth_ref.get('OS-TRUST:trust', {}).get('trustor_user', {})
+    return auth_ref.project_id, trustor.get('id')
+
+
+def _trust_client(trust_id):
+    """Return new context and Keystone client authenticated by the trust."""
     ctx = context.Context()
     ctx.user_name = CONF.os_admin_username
     ctx.tenant_name = CONF.os_admin_tenant_name
@@ -64,9 +101,19 @@ def create_ctx_from_trust(trust_id):
         auth_url=auth_url,
         ctx=ctx
     )
+    return ctx, keystone_client
+
 
+def _authenticate_by_trust(trust_id):
+    ctx, keystone_client = _trust_client(trust_id)
     ctx.auth_token = keystone_client.auth_token
-    ctx.service_catalog = json.dumps(
-        keystone_client.service_catalog.catalog['catalog']
-    )
-    context.set_ctx(ctx)
+    ctx.service_catalog = keystone_client.service_catalog.catalog['catalog']
+
+    # Keystone returns timezone aware expiration time
+    expires = timeutils.normalize_time(keystone_client.auth_ref.expires)
+    ttl = (timeutils.delta_seconds(timeutils.utcnow(), expires) -
+           CONF.trust_token_refresh_margin)
+    if ttl > 0:
+        _trust_contexts().set(trust_id, ctx, ttl)
+
+    return ctx
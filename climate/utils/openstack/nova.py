@@ -13,13 +13,128 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from eventlet import event as eventlet_event
 from novaclient import exceptions as nova_exception
 from novaclient.v1_1 import client as nova_client
+from oslo.config import cfg
 
+from climate.utils import cache
 import climate.utils.openstack.base as base
 
 
+opts = [
+    cfg.IntOpt('nova_client_cache_size',
+               default=100,
+               help='Maximal number of Nova clients kept for reuse, '
+                    'one client is kept per token.'),
+    cfg.IntOpt('nova_client_cache_ttl',
+               default=300,
+               help='Time in seconds Nova client is kept for reuse.'),
+    cfg.IntOpt('nova_poll_batch_size',
+               default=100,
+               help='Maximal number of server lists kept to answer status '
+                    'checks of instances, one list is kept per token.'),
+    cfg.IntOpt('nova_server_poll_ttl',
+               default=2,
+               help='Time in seconds instances listed from Nova are reused '
+                    'to answer status checks of other instances.'),
+]
+
+CONF = cfg.CONF
+CONF.register_cli_opts(opts)
+
+_CLIENTS = None
+_POLLER = None
+
+
+def _clients():
+    global _CLIENTS
+    if _CLIENTS is None:
+        _CLIENTS = cache.LRUCache(CONF.nova_client_cache_size,
+                                  CONF.nova_client_cache_ttl)
+    return _CLIENTS
+
+
+def _poller():
+    global _POLLER
+    if _POLLER is None:
+        _POLLER = ServerPoller(CONF.nova_poll_batch_size,
+                               CONF.nova_server_poll_ttl)
+    return _POLLER
+
+
+class ServerPoller(object):
+    """Gets states of many instances with one Nova request.
+
+    Nova can not filter servers by a list of IDs, so all servers visible
+    with the token are listed at once and kept for ttl seconds to answer
+    the following checks. Callers asking while the list is being fetched
+    wait for the same request instead of sending their own.
+
+    Nova truncates long lists to its osapi_max_limit, so instances missing
+    from the list are requested one by one and only those Nova does not
+    find are treated as deleted.
+    """
+
+    def __init__(self, size, ttl):
+        # token -> {instance_id: server}
+        self._servers = cache.LRUCache(size, ttl)
+        # token -> event sent with the servers being fetched
+        self._fetching = {}
+
+    def get_many(self, instance_ids, ctx):
+        """Return dict of existing instances by ID."""
+        servers = self._servers.get(ctx.auth_token)
+        if servers is None:
+            servers = self._fetch(ctx)
+
+        result = {}
+        for instance_id in instance_ids:
+            server = servers.get(instance_id)
+            if server is None:
+                try:
+                    server = client(ctx).servers.get(instance_id)
+                except nova_exception.NotFound:
+                    continue
+                servers[instance_id] = server
+            result[instance_id] = server
+        return result
+
+    def invalidate(self, ctx):
+        """Forget servers fetched with the token after they were changed."""
+        self._servers.pop(ctx.auth_token)
+
+    def _fetch(self, ctx):
+        token = ctx.auth_token
+        if token in self._fetching:
+            return self._fetching[token].wait()
+
+        fetched = eventlet_event.Event()
+        self._fetching[token] = fetched
+        try:
+            servers = dict((server.id, server)
+                           for server in client(ctx).servers.list())
+        except Exception as e:
+            fetched.send_exception(e)
+            raise
+        else:
+            self._servers.set(token, servers)
+            fetched.send(servers)
+            return servers
+        finally:
+            del self._fetching[token]
+
+
 def client(ctx):
+    """Return Nova client for the context token.
+
+    Clients are reused together with their HTTP connections as long as
+    the same token is used.
+    """
+    nova = _clients().get(ctx.auth_token)
+    if nova is not None:
+        return nova
+
     compute_url = base.url_for(ctx.service_catalog, 'compute')
 
     nova = nova_client.Client(ctx.user_name,
@@ -29,11 +144,13 @@ def client(ctx):
     nova.client.auth_token = ctx.auth_token
     nova.client.management_url = compute_url
 
+    _clients().set(ctx.auth_token, nova)
     return nova
 
 
 def wake_up(instance_id, ctx):
     client(ctx).servers.wake_up(instance_id)
+    _poller().invalidate(ctx)
 
 
 def delete(instance_id, ctx):
@@ -41,21 +158,46 @@ def delete(instance_id, ctx):
         client(ctx).servers.delete(instance_id)
     except nova_exception.NotFound:
         pass
+    _poller().invalidate(ctx)
 
 
 def get(instance_id, ctx):
     return client(ctx).servers.get(instance_id)
 
 
+def get_many(instance_ids, ctx):
+    """Return dict of existing instances by ID.
+
+    Instances are fetched with one request shared by the concurrent
+    callers and reused for nova_server_poll_ttl seconds.
+    """
+    return _poller().get_many(instance_ids, ctx)
+
+
+def set_meta(instance_id, metadata, ctx):
+    client(ctx).servers.set_meta(instance_id, metadata)
+    _poller().invalidate(ctx)
+
+
 def suspend(instance_id, ctx):
     client(ctx).servers.suspend(instance_id)
+    _poller().invalidate(ctx)
+
+
+def create_image(instance_id, ctx, instance_name=None, metadata=None):
+    nova = client(ctx)
+    if instance_name is None:
+        instance_name = nova.servers.get(instance_id).name
+    nova.servers.create_image(instance_id, "reserved_%s" % instance_name,
+                              metadata)
+    _poller().invalidate(ctx)
 
 
-def create_image(instance_id, ctx):
-    instance = get(instance_id, ctx)
-    instance_name = instance.name
-    client(ctx).servers.create_image(instance_id,
-                                     "reserved_%s" % instance_name)
+def get_images_by_meta(key, ctx):
+    """Return dict of images having the metadata key by the key value."""
+    return dict((image.metadata[key], image)
+                for image in client(ctx).images.list()
+                if key in image.metadata)
 
 
 def backup(instance_id):
@@ -0,0 +1,44 @@
+# Copyright (c) 2013 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""JSON serialization of API responses."""
+
+import datetime
+import json
+
+
+def _default(obj):
+    """Convert objects json module does not know to JSON types.
+
+    Datetimes are written in ISO format without microseconds.
+    """
+    if isinstance(obj, datetime.datetime):
+        if obj.tzinfo is None:
+            # cutting microseconds off the string is twice as fast as
+            # building a new datetime without them
+            return obj.isoformat()[:19]
+        return obj.replace(microsecond=0).isoformat()
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    return unicode(obj)
+
+
+# encoder is stateless, sharing it saves its construction on every call
+_ENCODER = json.JSONEncoder(default=_default)
+
+
+def dumps(data):
+    """Serialize data to JSON."""
+    return _ENCODER.encode(data)
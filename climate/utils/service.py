@@ -23,6 +23,10 @@ from climate.openstack.common import rpc
 
 def prepare_service(argv=[]):
     rpc.set_defaults(control_exchange='climate')
+    # let climate exceptions raised by climate-manager pass through RPC
+    cfg.set_defaults(rpc.rpc_opts,
+                     allowed_rpc_exception_modules=['climate.exceptions',
+                                                    'exceptions'])
     cfg.set_defaults(log.log_opts,
                      default_log_levels=['amqplib=WARN',
                                          'qpid.messaging=INFO',
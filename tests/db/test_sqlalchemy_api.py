@@ -0,0 +1,195 @@
+# Copyright (c) 2013 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import contextlib
+import datetime
+import unittest
+
+from oslo.config import cfg
+import sqlalchemy as sa
+
+from climate import context
+from climate.db import api as db_api
+from climate.db.sqlalchemy import api as sa_api
+from climate import exceptions
+from climate.openstack.common.db.sqlalchemy import session as db_session
+
+
+class QueryCounter(object):
+    """Counts SQL statements executed by the engine."""
+
+    def __init__(self, engine):
+        self.count = 0
+        self.enabled = False
+        sa.event.listen(engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args, **kwargs):
+        if self.enabled:
+            self.count += 1
+
+    @contextlib.contextmanager
+    def __call__(self):
+        self.count = 0
+        self.enabled = True
+        try:
+            yield self
+        finally:
+            self.enabled = False
+
+
+class SQLAlchemyApiTestCase(unittest.TestCase):
+    def setUp(self):
+        cfg.CONF.set_override('connection', 'sqlite://', group='database')
+        db_session.cleanup()
+        db_api.setup_db()
+        self.queries = QueryCounter(sa_api.get_engine())
+        self.ctx = context.Context()
+        self.start = datetime.datetime(2030, 1, 1, 10, 0)
+        self.end = datetime.datetime(2030, 1, 2, 10, 0)
+
+    def tearDown(self):
+        db_api.drop_db()
+        db_session.cleanup()
+        cfg.CONF.clear_override('connection', group='database')
+
+    def _create_lease(self, name='lease', tenant_id=None):
+        return db_api.lease_create(self.ctx, {
+            'name': name,
+            'tenant_id': tenant_id,
+            'start_date': self.start,
+            'end_date': self.end,
+            'reservations': [{'resource_id': 'vm1',
+                              'resource_type': 'virtual:instance'},
+                             {'resource_id': 'vm2',
+                              'resource_type': 'virtual:instance'}],
+            'events': [{'event_type': 'start_lease', 'time': self.start},
+                       {'event_type': 'end_lease', 'time': self.end},
+                       {'event_type': 'notify', 'time': self.end}]})
+
+    def test_lease_create(self):
+        with self.queries() as queries:
+            lease = self._create_lease()
+        # lease, reservations and events inserts and the lease refresh
+        self.assertEqual(queries.count, 4)
+        self.assertEqual(len(lease['reservations']), 2)
+        self.assertEqual(len(lease['events']), 3)
+
+    def test_lease_update(self):
+        lease = self._create_lease()
+        with self.queries() as queries:
+            lease = db_api.lease_update(self.ctx, lease['id'],
+                                        {'name': 'renamed'})
+        self.assertEqual(queries.count, 2)
+        self.assertEqual(lease['name'], 'renamed')
+        self.assertEqual(len(lease['events']), 3)
+
+    def test_lease_prolong(self):
+        lease = self._create_lease()
+        with self.queries() as queries:
+            db_api.lease_prolong(self.ctx, lease['id'], 3600,
+                                 ['end_lease', 'notify'])
+        self.assertEqual(queries.count, 2)
+
+        lease = db_api.lease_get(self.ctx, lease['id'])
+        new_end = self.end + datetime.timedelta(hours=1)
+        self.assertEqual(lease['end_date'], new_end)
+        times = dict((e['event_type'], e['time']) for e in lease['events'])
+        self.assertEqual(times, {'start_lease': self.start,
+                                 'end_lease': new_end,
+                                 'notify': new_end})
+
+    def test_lease_prolong_keeps_microseconds(self):
+        self.end = self.end.replace(microsecond=123456)
+        lease = self._create_lease()
+        db_api.lease_prolong(self.ctx, lease['id'], 60, ['end_lease'])
+
+        lease = db_api.lease_get(self.ctx, lease['id'])
+        self.assertEqual(lease['end_date'],
+                         self.end + datetime.timedelta(seconds=60))
+
+    def test_lease_list_project_only(self):
+        self._create_lease('lease1', tenant_id='tenant1')
+        self._create_lease('lease2', tenant_id='tenant2')
+
+        user_ctx = context.Context(tenant_id='tenant1', roles=['member'])
+        leases = db_api.lease_list(user_ctx)
+        self.assertEqual([l['name'] for l in leases], ['lease1'])
+        self.assertEqual(db_api.lease_get_all_by_tenant(user_ctx,
+                                                        'tenant2'), [])
+
+        admin_ctx = context.Context(tenant_id='tenant1', roles=['admin'])
+        self.assertEqual(len(db_api.lease_list(admin_ctx)), 2)
+        leases = db_api.lease_get_all_by_tenant(admin_ctx, 'tenant2')
+        self.assertEqual([l['name'] for l in leases], ['lease2'])
+
+    def test_lease_list_unknown_marker(self):
+        self._create_lease()
+        try:
+            db_api.lease_list(self.ctx, marker='unknown')
+        except exceptions.InvalidInput as e:
+            self.assertEqual(e.message, 'Marker lease unknown not found.')
+        else:
+            self.fail('InvalidInput not raised')
+
+    def test_lease_refresh_status(self):
+        lease = self._create_lease()
+        self.assertEqual(lease['status'], 'UNDONE')
+
+        for i, event in enumerate(lease['events']):
+            db_api.event_update(self.ctx, event['id'], {'status': 'DONE'})
+            with self.queries() as queries:
+                db_api.lease_refresh_status(self.ctx, lease['id'])
+            self.assertEqual(queries.count, 1)
+
+            leases = db_api.lease_list(self.ctx, fields=['status'])
+            if i < len(lease['events']) - 1:
+                self.assertEqual(leases[0]['status'], 'IN_PROGRESS')
+        self.assertEqual(leases[0]['status'], 'DONE')
+
+    def test_reservation_update(self):
+        reservation = self._create_lease()['reservations'][0]
+        with self.queries() as queries:
+            reservation = db_api.reservation_update(
+                self.ctx, reservation['id'], {'status': 'active'})
+        self.assertEqual(queries.count, 2)
+        self.assertEqual(reservation['status'], 'active')
+
+    def test_event_create(self):
+        lease = self._create_lease()
+        with self.queries() as queries:
+            event = db_api.event_create(self.ctx, {'lease_id': lease['id'],
+                                                   'event_type': 'notify',
+                                                   'time': self.start,
+                                                   'status': 'UNDONE'})
+        self.assertEqual(queries.count, 1)
+        self.assertEqual(event['event_type'], 'notify')
+
+    def test_event_update(self):
+        event = self._create_lease()['events'][0]
+        with self.queries() as queries:
+            event = db_api.event_update(self.ctx, event['id'],
+                                        {'status': 'DONE'})
+        self.assertEqual(queries.count, 2)
+        self.assertEqual(event['status'], 'DONE')
+
+    def test_event_claim(self):
+        event = self._create_lease()['events'][0]
+        stale_before = datetime.datetime.utcnow()
+        with self.queries() as queries:
+            self.assertTrue(db_api.event_claim(self.ctx, event['id'],
+                                               'manager1', stale_before))
+        self.assertEqual(queries.count, 1)
+        self.assertFalse(db_api.event_claim(self.ctx, event['id'],
+                                            'manager2', stale_before))
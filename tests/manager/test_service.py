@@ -0,0 +1,244 @@
+# Copyright (c) 2013 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+
+import eventlet
+from eventlet import greenpool
+import mock
+import unittest
+
+from oslo.config import cfg
+
+from climate.manager import service
+
+CONF = cfg.CONF
+
+
+class DispatchDueEventsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.manager = service.ManagerService.__new__(service.ManagerService)
+        self.manager.internal_context = None
+        self.manager.running_events = set()
+        self.manager.event_owner = 'host:1'
+        self.events = [{'id': 'event%s' % i, 'status': 'UNDONE'}
+                       for i in range(10)]
+
+        self.patchers = [
+            mock.patch.object(service.db_api,
+                              'event_get_all_sorted_by_filters',
+                              side_effect=self._get_due_events),
+            mock.patch.object(service.db_api, 'event_claim',
+                              side_effect=self._claim),
+            mock.patch.object(service.eventlet, 'spawn_n'),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+        CONF.set_override('event_batch_size', 3)
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        CONF.clear_override('event_batch_size')
+
+    def _get_due_events(self, ctx, sort_key, sort_dir, filters, limit=None,
+                        with_lease=False):
+        return [dict(event) for event in self.events
+                if event['status'] == 'UNDONE'][:limit]
+
+    def _claim(self, ctx, event_id, owner, stale_before):
+        for event in self.events:
+            if event['id'] == event_id and event['status'] == 'UNDONE':
+                event['status'] = 'IN_PROGRESS'
+                return True
+        return False
+
+    def test_all_due_events_started_in_one_pass(self):
+        # the started events are not run, spawn_n is mocked
+        self.manager._dispatch_due_events()
+
+        self.assertEqual(self.manager.running_events,
+                         set(event['id'] for event in self.events))
+        self.assertEqual(service.eventlet.spawn_n.call_count, 4)
+
+    def test_events_claimed_by_others_skipped(self):
+        self.events[0]['status'] = 'IN_PROGRESS'
+        self.assertEqual(self.manager._start_events([self.events[0]]), 0)
+        self.assertFalse(service.eventlet.spawn_n.called)
+
+
+class RunEventsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.manager = service.ManagerService.__new__(service.ManagerService)
+        self.manager.event_pool = greenpool.GreenPool(10)
+        self.manager.running_events = set()
+        self.manager.lease_events = {}
+        self.calls = []
+        self.manager._process_event = self._process_event
+
+    def _process_event(self, event):
+        self.calls.append(('start', event['id']))
+        eventlet.sleep(0.01)
+        self.calls.append(('end', event['id']))
+
+    def test_lease_events_run_in_time_order(self):
+        start = datetime.datetime(2030, 1, 1, 10, 0)
+        end = start + datetime.timedelta(hours=1)
+        events = [{'id': 'end1', 'lease_id': 'lease1', 'time': end},
+                  {'id': 'start1', 'lease_id': 'lease1', 'time': start},
+                  {'id': 'start2', 'lease_id': 'lease2', 'time': start}]
+        self.manager.running_events.update(event['id'] for event in events)
+
+        self.manager._run_events(events)
+
+        lease1_calls = [call for call in self.calls
+                        if call[1] in ('start1', 'end1')]
+        self.assertEqual(lease1_calls, [('start', 'start1'),
+                                         ('end', 'start1'),
+                                         ('start', 'end1'),
+                                         ('end', 'end1')])
+        # events of different leases still run concurrently
+        self.assertEqual(self.calls[:2], [('start', 'start1'),
+                                          ('start', 'start2')])
+        self.assertEqual(self.manager.running_events, set())
+        self.assertEqual(self.manager.lease_events, {})
+
+
+class ProcessEventTestCase(unittest.TestCase):
+    def setUp(self):
+        self.manager = service.ManagerService.__new__(service.ManagerService)
+        self.manager.internal_context = None
+        self.manager._lease_changed = mock.Mock()
+        self.event = {'id': 'event1', 'lease_id': 'lease1', 'time': 'now',
+                      'event_type': 'custom', 'lease': {'id': 'lease1'}}
+        self.patcher = mock.patch.object(service, 'db_api')
+        self.db_api = self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_handler_without_lease_argument(self):
+        calls = []
+        self.manager.custom = lambda lease_id, event_time: calls.append(
+            (lease_id, event_time))
+
+        self.manager._process_event(self.event)
+
+        self.assertEqual(calls, [('lease1', 'now')])
+        self.db_api.event_update.assert_called_once_with(
+            None, 'event1', {'status': 'DONE'})
+
+    def test_handler_with_lease_argument(self):
+        calls = []
+        self.manager.custom = lambda lease_id, event_time, lease=None: \
+            calls.append(lease)
+
+        self.manager._process_event(self.event)
+
+        self.assertEqual(calls, [{'id': 'lease1'}])
+
+
+class FillLeaseOwnersTestCase(unittest.TestCase):
+    def setUp(self):
+        self.manager = service.ManagerService.__new__(service.ManagerService)
+        self.manager.internal_context = None
+        self.manager._lease_changed = mock.Mock()
+        self.patchers = [mock.patch.object(service, 'db_api'),
+                         mock.patch.object(service, 'keystone')]
+        self.db_api, self.keystone = [patcher.start()
+                                      for patcher in self.patchers]
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    def test_owner_taken_from_trust(self):
+        self.db_api.lease_get_all_by_tenant.return_value = [
+            {'id': 'lease1', 'trust_id': 'trust1'},
+            {'id': 'lease2', 'trust_id': None}]
+        self.keystone.get_trust_owner.return_value = ('tenant1', 'user1')
+
+        self.manager._fill_lease_owners()
+
+        self.db_api.lease_get_all_by_tenant.assert_called_once_with(None,
+                                                                    None)
+        self.keystone.get_trust_owner.assert_called_once_with('trust1')
+        self.db_api.lease_update.assert_called_once_with(
+            None, 'lease1', {'tenant_id': 'tenant1', 'user_id': 'user1'})
+        self.manager._lease_changed.assert_called_once_with('lease1')
+
+
+class DeleteLeaseTestCase(unittest.TestCase):
+    def setUp(self):
+        self.manager = service.ManagerService.__new__(service.ManagerService)
+        self.manager.internal_context = None
+        self.manager._lease_changed = mock.Mock()
+        self.patchers = [mock.patch.object(service, 'db_api'),
+                         mock.patch.object(service, 'keystone')]
+        self.db_api, self.keystone = [patcher.start()
+                                      for patcher in self.patchers]
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    def test_failure_stored_in_lease_status(self):
+        self.keystone.create_ctx_from_trust.side_effect = ValueError()
+
+        self.manager._delete_lease(None, {'id': 'lease1', 'trust_id': 'trust1',
+                                          'reservations': []})
+
+        self.db_api.lease_update.assert_called_once_with(
+            None, 'lease1', {'status': 'DELETE_FAILED'})
+        self.assertFalse(self.db_api.lease_destroy.called)
+        self.manager._lease_changed.assert_called_once_with('lease1')
+
+
+class LoadEventsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.manager = service.ManagerService.__new__(service.ManagerService)
+        self.manager.internal_context = None
+        self.manager.event_heap = mock.Mock()
+        self.patcher = mock.patch.object(service, 'db_api')
+        self.db_api = self.patcher.start()
+        CONF.set_override('event_interval', 60)
+        CONF.set_override('event_batch_size', 2)
+        self.now = datetime.datetime(2030, 1, 1, 10, 0)
+
+    def tearDown(self):
+        self.patcher.stop()
+        CONF.clear_override('event_interval')
+        CONF.clear_override('event_batch_size')
+
+    def test_only_next_window_loaded(self):
+        events = [{'id': 'event1', 'time': self.now}]
+        self.db_api.event_get_all_sorted_by_filters.return_value = events
+
+        next_load = self.manager._load_events(self.now)
+
+        horizon = self.now + datetime.timedelta(seconds=60)
+        self.assertEqual(next_load, horizon)
+        self.db_api.event_get_all_sorted_by_filters.assert_called_once_with(
+            None, sort_key='time', sort_dir='asc',
+            filters={'status': ['UNDONE'], 'time': horizon}, limit=2)
+        self.manager.event_heap.load.assert_called_once_with(events)
+
+    def test_truncated_window_reloaded_earlier(self):
+        later = self.now + datetime.timedelta(seconds=10)
+        self.db_api.event_get_all_sorted_by_filters.return_value = [
+            {'id': 'event1', 'time': self.now},
+            {'id': 'event2', 'time': later}]
+
+        self.assertEqual(self.manager._load_events(self.now), later)
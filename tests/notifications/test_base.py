@@ -0,0 +1,53 @@
+# Copyright (c) 2013 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import eventlet
+import unittest
+
+from climate.notifications import base
+
+
+class FakeNotifier(base.BaseNotifier):
+    idle_timeout = 0
+
+    def __init__(self, delay=0):
+        super(FakeNotifier, self).__init__()
+        self.delay = delay
+        self.batches = []
+
+    def send(self, notifications):
+        eventlet.sleep(self.delay)
+        self.batches.append([text for _, _, text in notifications])
+
+
+class BaseNotifierTestCase(unittest.TestCase):
+    def test_rate_limit_splits_batches(self):
+        notifier = FakeNotifier()
+        notifier.rate_limit = 100
+        notifier.batch_size = 2
+        for text in ('a', 'b', 'c'):
+            notifier.notify('user', 'subject', text)
+        notifier._sender.wait()
+        self.assertEqual(notifier.batches, [['a', 'b'], ['c']])
+
+    def test_slow_notifier_does_not_block_others(self):
+        slow = FakeNotifier(delay=10)
+        fast = FakeNotifier()
+        for notifier in (slow, fast):
+            notifier.notify('user', 'subject', 'text')
+        fast._sender.wait()
+        self.assertEqual(fast.batches, [['text']])
+        self.assertEqual(slow.batches, [])
+        slow._sender.kill()
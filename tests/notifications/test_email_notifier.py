@@ -0,0 +1,72 @@
+# Copyright (c) 2013 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import smtplib
+
+import mock
+from oslo.config import cfg
+import unittest
+
+from climate import config  # noqa
+from climate.notifications import email_notifier
+
+
+class EmailNotifierTestCase(unittest.TestCase):
+    overrides = (('mail_use_tls', False),
+                 ('mail_user_password', ''),
+                 ('mail_idle_timeout', 0),
+                 ('mail_retry_interval', 0))
+
+    def setUp(self):
+        for name, value in self.overrides:
+            cfg.CONF.set_override(name, value)
+
+        self.patcher = mock.patch('smtplib.SMTP')
+        self.smtp = self.patcher.start()
+        self.notifier = email_notifier.EmailNotifier()
+
+    def tearDown(self):
+        self.patcher.stop()
+        for name, _ in self.overrides:
+            cfg.CONF.clear_override(name)
+
+    def _send(self, *notifications):
+        for notification in notifications:
+            self.notifier.notify(*notification)
+        self.notifier._sender.wait()
+
+    def test_notifications_joined_per_recipient(self):
+        self._send(('user@example.com', 'Lease', 'first'),
+                   ('user@example.com', 'Lease', 'second'),
+                   ('admin@example.com', 'Lease', 'third'))
+
+        self.assertEqual(self.smtp.call_count, 1)
+        server = self.smtp.return_value
+        self.assertFalse(server.login.called)
+        self.assertFalse(server.starttls.called)
+        sent = dict((args[1], args[2])
+                    for args, _ in server.sendmail.call_args_list)
+        self.assertEqual(len(sent), 2)
+        self.assertTrue('first\n\nsecond' in sent['user@example.com'])
+        server.quit.assert_called_once_with()
+
+    def test_retry_with_new_session(self):
+        server = self.smtp.return_value
+        server.sendmail.side_effect = [smtplib.SMTPServerDisconnected(),
+                                       None]
+        self._send(('user@example.com', 'Lease', 'text'))
+
+        self.assertEqual(self.smtp.call_count, 2)
+        self.assertEqual(server.sendmail.call_count, 2)
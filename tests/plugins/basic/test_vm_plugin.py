@@ -0,0 +1,115 @@
+# Copyright (c) 2013 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+import unittest
+
+from climate.plugins.basic import vm_plugin
+
+
+class VMTeardownTestCase(unittest.TestCase):
+    def setUp(self):
+        self.patchers = [mock.patch.object(vm_plugin, 'nova'),
+                         mock.patch.object(vm_plugin.eventlet, 'spawn')]
+        self.nova = self.patchers[0].start()
+        self.patchers[1].start()
+
+        self.ctx = mock.Mock(auth_token='token')
+        self.server = mock.Mock(metadata={})
+        self.server.name = 'vm'
+        setattr(self.server, 'OS-EXT-STS:task_state', None)
+        self.nova.get_many.return_value = {'vm1': self.server}
+        self.nova.get_images_by_meta.return_value = {}
+
+        self.teardown = vm_plugin.VMTeardown()
+        self.handle = self.teardown.delete('vm1', self.ctx)
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    def _snapshot_requested(self):
+        self.server.metadata = {
+            vm_plugin.TEARDOWN_KEY: vm_plugin.SNAPSHOT_REQUESTED}
+
+    def test_snapshot_wait_and_delete(self):
+        self.assertTrue(self.teardown._check())
+        self.nova.create_image.assert_called_once_with(
+            'vm1', self.ctx, 'vm', {vm_plugin.SNAPSHOT_OF_KEY: 'vm1'})
+        self.nova.set_meta.assert_called_once_with(
+            'vm1', {vm_plugin.TEARDOWN_KEY: vm_plugin.SNAPSHOT_REQUESTED},
+            self.ctx)
+        self.assertFalse(self.handle.ready())
+
+        # the snapshot is being uploaded
+        self._snapshot_requested()
+        setattr(self.server, 'OS-EXT-STS:task_state', 'image_uploading')
+        self.assertFalse(self.teardown._check())
+        self.assertFalse(self.nova.delete.called)
+
+        setattr(self.server, 'OS-EXT-STS:task_state', None)
+        self.assertTrue(self.teardown._check())
+        self.nova.delete.assert_called_once_with('vm1', self.ctx)
+        self.assertTrue(self.handle.ready())
+        self.assertEqual(self.teardown._pending, {})
+
+    def test_resume_from_metadata(self):
+        self._snapshot_requested()
+
+        self.teardown._check()
+
+        self.assertFalse(self.nova.create_image.called)
+        self.assertFalse(self.nova.get_images_by_meta.called)
+        self.nova.delete.assert_called_once_with('vm1', self.ctx)
+        self.assertEqual(self.handle.wait(), None)
+
+    def test_snapshot_exists(self):
+        self.nova.get_images_by_meta.return_value = {'vm1': mock.Mock()}
+
+        self.teardown._check()
+
+        self.assertFalse(self.nova.create_image.called)
+        self.assertTrue(self.nova.set_meta.called)
+        self.assertFalse(self.handle.ready())
+
+    def test_server_not_found(self):
+        self.nova.get_many.return_value = {}
+
+        self.teardown._check()
+
+        self.assertFalse(self.nova.delete.called)
+        self.assertEqual(self.handle.wait(), None)
+
+    def test_server_deleted_during_snapshot(self):
+        self.nova.set_meta.side_effect = \
+            vm_plugin.nova_exceptions.NotFound(404)
+
+        self.teardown._check()
+
+        self.assertEqual(self.handle.wait(), None)
+        self.assertEqual(self.teardown._pending, {})
+
+    def test_image_not_found(self):
+        self.nova.create_image.side_effect = \
+            vm_plugin.nova_exceptions.NotFound(404)
+
+        self.teardown._check()
+
+        # the instance is deleted without the snapshot
+        self.assertTrue(self.nova.set_meta.called)
+        self._snapshot_requested()
+        self.teardown._check()
+        self.nova.delete.assert_called_once_with('vm1', self.ctx)
+        self.assertEqual(self.handle.wait(), None)
@@ -0,0 +1,68 @@
+# Copyright (c) 2013 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from climate import exceptions
+from climate.plugins import base
+
+
+class ActionHandleTestCase(unittest.TestCase):
+    def test_spawn_result(self):
+        handle = base.ActionHandle.spawn(lambda x: x * 2, 21)
+        self.assertEqual(handle.wait(), 42)
+        self.assertTrue(handle.ready())
+
+    def test_spawn_exception(self):
+        def fail():
+            raise ValueError()
+
+        handle = base.ActionHandle.spawn(fail)
+        self.assertRaises(ValueError, handle.wait)
+
+    def test_timeout(self):
+        handle = base.ActionHandle()
+        self.assertRaises(exceptions.ActionTimeoutException,
+                          handle.wait, 0.01)
+        handle.succeed('done')
+        self.assertEqual(handle.wait(0.01), 'done')
+
+
+class FakePlugin(base.BasePlugin):
+    def get_title(self):
+        return 'Fake Plugin'
+
+    def delete(self, resource_id, ctx):
+        if resource_id == 'bad':
+            raise ValueError()
+        return base.ActionHandle.spawn(lambda: 'deleted %s' % resource_id)
+
+    def wake_up(self, resource_id, ctx):
+        return 'woken up %s' % resource_id
+
+
+class BulkActionsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.plugin = FakePlugin()
+
+    def test_wake_up_many(self):
+        handles = self.plugin.wake_up_many(['vm1', 'vm2'], None)
+        self.assertEqual(dict((k, h.wait()) for k, h in handles.items()),
+                         {'vm1': 'woken up vm1', 'vm2': 'woken up vm2'})
+
+    def test_delete_many(self):
+        handles = self.plugin.delete_many(['vm1', 'bad'], None)
+        self.assertEqual(handles['vm1'].wait(), 'deleted vm1')
+        self.assertRaises(ValueError, handles['bad'].wait)
@@ -0,0 +1,50 @@
+# Copyright (c) 2013 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import unittest
+
+import mock
+
+from climate import exceptions
+from climate.openstack.common.rpc import common as rpc_common
+
+
+class RemoteExceptionTestCase(unittest.TestCase):
+    def _pass_through_rpc(self, exc):
+        try:
+            raise exc
+        except Exception:
+            data = rpc_common.serialize_remote_exception(sys.exc_info(),
+                                                         log_failure=False)
+        conf = mock.Mock(allowed_rpc_exception_modules=['climate.exceptions'])
+        return rpc_common.deserialize_remote_exception(conf, data)
+
+    def test_lease_not_found(self):
+        exc = self._pass_through_rpc(exceptions.LeaseNotFound('lease1'))
+        self.assertTrue(isinstance(exc, exceptions.LeaseNotFound))
+        self.assertEqual(exc.message, 'Lease lease1 not found')
+        self.assertEqual(exc.code, 'NOT_FOUND')
+
+    def test_not_found(self):
+        exc = self._pass_through_rpc(
+            exceptions.NotFoundException('marker', 'Lease %s not found'))
+        self.assertTrue(isinstance(exc, exceptions.NotFoundException))
+        self.assertEqual(exc.message, 'Lease marker not found')
+
+    def test_invalid_input(self):
+        exc = self._pass_through_rpc(exceptions.InvalidInput('Bad limit.'))
+        self.assertTrue(isinstance(exc, exceptions.InvalidInput))
+        self.assertEqual(exc.message, 'Bad limit.')
@@ -0,0 +1,87 @@
+# Copyright (c) 2013 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import unittest
+
+from climate.utils.openstack import base
+
+V3_CATALOG = [
+    {'type': 'compute',
+     'endpoints': [{'interface': 'public', 'region': 'east',
+                    'url': 'http://east:8774'},
+                   {'interface': 'admin', 'region': 'east',
+                    'url': 'http://east-admin:8774'},
+                   {'interface': 'public', 'region': 'west',
+                    'url': 'http://west:8774'}]},
+    {'type': 'identityv3',
+     'endpoints': [{'interface': 'public', 'region': 'east',
+                    'url': 'http://east:5000/v3'}]},
+]
+
+V2_CATALOG = [
+    {'type': 'compute',
+     'endpoints': [{'publicURL': 'http://east:8774',
+                    'adminURL': 'http://east-admin:8774',
+                    'region': 'east'},
+                   {'publicURL': 'http://west:8774',
+                    'adminURL': 'http://west-admin:8774',
+                    'region': 'west'}]},
+]
+
+
+class ServiceCatalogTestCase(unittest.TestCase):
+    def test_v3_catalog(self):
+        catalog = base.ServiceCatalog(json.dumps(V3_CATALOG))
+        self.assertEqual(catalog.url_for('compute'), 'http://east:8774')
+        self.assertEqual(catalog.url_for('compute', 'admin'),
+                         'http://east-admin:8774')
+        self.assertEqual(catalog.url_for('identityv3'),
+                         'http://east:5000/v3')
+        self.assertEqual(catalog.url_for('volume'), None)
+
+    def test_v2_catalog(self):
+        catalog = base.ServiceCatalog(V2_CATALOG)
+        self.assertEqual(catalog.url_for('compute'), 'http://east:8774')
+        self.assertEqual(catalog.url_for('compute', 'admin'),
+                         'http://east-admin:8774')
+        self.assertEqual(catalog.url_for('compute', 'internal'), None)
+
+    def test_region(self):
+        for raw_catalog in (V3_CATALOG, V2_CATALOG):
+            catalog = base.ServiceCatalog(raw_catalog)
+            self.assertEqual(catalog.url_for('compute', region='west'),
+                             'http://west:8774')
+            self.assertEqual(catalog.url_for('compute', region='north'),
+                             None)
+
+    def test_empty_catalog(self):
+        for raw_catalog in ('', None, []):
+            catalog = base.ServiceCatalog(raw_catalog)
+            self.assertEqual(catalog.url_for('compute'), None)
+            self.assertEqual(catalog.to_primitive(), [])
+            self.assertEqual(catalog.to_json(), '[]')
+
+    def test_json_round_trip(self):
+        catalog = base.ServiceCatalog(V3_CATALOG)
+        copy = base.ServiceCatalog(catalog.to_json())
+        self.assertEqual(copy.to_primitive(), V3_CATALOG)
+        self.assertEqual(copy.url_for('compute', region='west'),
+                         'http://west:8774')
+
+    def test_url_for_not_found(self):
+        self.assertRaises(Exception, base.url_for, V3_CATALOG, 'volume')
+        self.assertEqual(base.url_for(V3_CATALOG, 'compute', admin=True),
+                         'http://east-admin:8774')
@@ -0,0 +1,53 @@
+# Copyright (c) 2013 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+import unittest
+
+from climate.utils import cache
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = cache.LRUCache(2, 10)
+
+    def test_get_set(self):
+        self.cache.set('a', 1)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.get('b', 'default'), 'default')
+
+    def test_least_recently_used_evicted(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.get('a')
+        self.cache.set('c', 3)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.get('b'), None)
+        self.assertEqual(self.cache.get('c'), 3)
+
+    @mock.patch('time.time')
+    def test_expired(self, fake_time):
+        fake_time.return_value = 100
+        self.cache.set('a', 1)
+        self.cache.set('b', 2, ttl=30)
+        fake_time.return_value = 115
+        self.assertEqual(self.cache.get('a'), None)
+        self.assertEqual(self.cache.get('b'), 2)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_disabled(self):
+        disabled = cache.LRUCache(0, 10)
+        disabled.set('a', 1)
+        self.assertEqual(disabled.get('a'), None)
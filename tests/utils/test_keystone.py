@@ -0,0 +1,80 @@
+# Copyright (c) 2013 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+
+import mock
+from oslo.config import cfg
+import unittest
+
+from climate import config  # noqa
+from climate import context
+from climate.openstack.common import timeutils
+from climate.utils.openstack import keystone
+
+
+class TrustContextCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        keystone._TRUST_CONTEXTS = None
+        cfg.CONF.set_override('trust_token_refresh_margin', 300)
+        self.now = datetime.datetime(2030, 1, 1, 10, 0)
+        timeutils.set_time_override(self.now)
+
+        self.time_patcher = mock.patch('time.time', return_value=1000)
+        self.time = self.time_patcher.start()
+        self.client_patcher = mock.patch.object(keystone, 'client')
+        self.client = self.client_patcher.start()
+        self.client.return_value.auth_token = 'token'
+        self.client.return_value.service_catalog.catalog = {'catalog': []}
+        self._expire_in(3600)
+
+    def tearDown(self):
+        self.client_patcher.stop()
+        self.time_patcher.stop()
+        timeutils.clear_time_override()
+        cfg.CONF.clear_override('trust_token_refresh_margin')
+        context.set_ctx(None)
+        keystone._TRUST_CONTEXTS = None
+
+    def _expire_in(self, seconds):
+        # Keystone reports timezone aware expiration time
+        expires = self.now + datetime.timedelta(seconds=seconds)
+        self.client.return_value.auth_ref.expires = timeutils.parse_isotime(
+            expires.strftime('%Y-%m-%dT%H:%M:%SZ'))
+
+    def test_token_reused(self):
+        keystone.create_ctx_from_trust('trust1')
+        keystone.create_ctx_from_trust('trust1')
+
+        self.assertEqual(self.client.call_count, 1)
+        self.assertEqual(context.current().auth_token, 'token')
+
+    def test_token_expired(self):
+        keystone.create_ctx_from_trust('trust1')
+        # the token is reused for its lifetime less the refresh margin
+        self.time.return_value = 1000 + 3600 - 300 - 1
+        keystone.create_ctx_from_trust('trust1')
+        self.assertEqual(self.client.call_count, 1)
+
+        self.time.return_value = 1000 + 3600 - 300
+        keystone.create_ctx_from_trust('trust1')
+        self.assertEqual(self.client.call_count, 2)
+
+    def test_token_expiring_within_margin_not_cached(self):
+        self._expire_in(200)
+        keystone.create_ctx_from_trust('trust1')
+        keystone.create_ctx_from_trust('trust1')
+
+        self.assertEqual(self.client.call_count, 2)
@@ -0,0 +1,66 @@
+# Copyright (c) 2013 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import eventlet
+import mock
+import unittest
+
+from climate.utils.openstack import nova
+
+
+class ServerPollerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.poller = nova.ServerPoller(10, 60)
+        self.ctx = mock.Mock(auth_token='token')
+        self.servers = [mock.Mock(id='vm1'), mock.Mock(id='vm2')]
+
+        self.patcher = mock.patch.object(nova, 'client')
+        self.client = self.patcher.start()
+
+        def list_servers():
+            eventlet.sleep(0)
+            return self.servers
+        self.client.return_value.servers.list.side_effect = list_servers
+        self.client.return_value.servers.get.side_effect = \
+            nova.nova_exception.NotFound(404)
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_concurrent_callers_share_request(self):
+        pool = eventlet.GreenPool()
+        results = list(pool.imap(lambda ids: self.poller.get_many(ids,
+                                                                  self.ctx),
+                                 [['vm1'], ['vm2', 'vm3']]))
+        self.assertEqual(results[0], {'vm1': self.servers[0]})
+        self.assertEqual(results[1], {'vm2': self.servers[1]})
+        self.assertEqual(self.client.return_value.servers.list.call_count, 1)
+
+    def test_invalidate(self):
+        self.poller.get_many(['vm1'], self.ctx)
+        self.poller.get_many(['vm1'], self.ctx)
+        self.poller.invalidate(self.ctx)
+        self.poller.get_many(['vm1'], self.ctx)
+        self.assertEqual(self.client.return_value.servers.list.call_count, 2)
+
+    def test_server_missing_from_list(self):
+        # Nova truncated the list, vm3 still exists
+        vm3 = mock.Mock(id='vm3')
+        self.client.return_value.servers.get.side_effect = None
+        self.client.return_value.servers.get.return_value = vm3
+
+        self.assertEqual(self.poller.get_many(['vm1', 'vm3'], self.ctx),
+                         {'vm1': self.servers[0], 'vm3': vm3})
+        self.client.return_value.servers.get.assert_called_once_with('vm3')
@@ -0,0 +1,142 @@
+# Copyright (c) 2013 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure events queries time while the events table grows.
+
+Usage:
+    python tools/benchmark_events_db.py [--connection URL] [--max-rows N]
+                                        [--undone-fraction F] [--force-drop]
+
+Fills the events table with events of the past, mostly finished and some
+still UNDONE, and times the queries used by climate-manager to find due
+events and events of a single lease.
+
+All Climate tables of the DB are dropped first. A temporary SQLite DB is
+used by default, other DBs are used only with --force-drop.
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from oslo.config import cfg
+
+from climate import context
+from climate.db import api as db_api
+from climate.db.sqlalchemy import api as sa_api
+from climate.db.sqlalchemy import models
+from climate.openstack.common import uuidutils
+
+CHUNK = 10000
+EVENT_TYPES = ('start_lease', 'end_lease', 'notify')
+
+
+def fill(engine, count, now, undone_fraction):
+    """Add count events of the past, one per minute.
+
+    The undone_fraction of them stays UNDONE, so they are due.
+    """
+    events = models.Event.__table__
+    leases = models.Lease.__table__
+    for chunk_start in xrange(0, count, CHUNK):
+        lease_rows = []
+        event_rows = []
+        for i in xrange(chunk_start, min(count, chunk_start + CHUNK), 3):
+            lease_id = uuidutils.generate_uuid()
+            start = now - datetime.timedelta(minutes=i)
+            lease_rows.append({'id': lease_id,
+                               'name': lease_id,
+                               'start_date': start,
+                               'end_date': start})
+            for event_type in EVENT_TYPES:
+                event_rows.append({'id': uuidutils.generate_uuid(),
+                                   'lease_id': lease_id,
+                                   'event_type': event_type,
+                                   'time': start,
+                                   'status': (
+                                       'UNDONE'
+                                       if random.random() < undone_fraction
+                                       else 'DONE')})
+        engine.execute(leases.insert(), lease_rows)
+        engine.execute(events.insert(), event_rows)
+    return lease_rows[-1]['id']
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--connection',
+                        help='SQLAlchemy connection string, temporary '
+                             'SQLite DB is used by default.')
+    parser.add_argument('--max-rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=100)
+    parser.add_argument('--undone-fraction', type=float, default=0.01,
+                        help='Fraction of events left UNDONE.')
+    parser.add_argument('--force-drop', action='store_true',
+                        help='Allow dropping tables of the DB given with '
+                             '--connection.')
+    args = parser.parse_args()
+
+    connection = args.connection
+    if not connection:
+        connection = 'sqlite:///%s' % tempfile.mkstemp(suffix='.sqlite')[1]
+    cfg.CONF([], project='climate')
+    cfg.CONF.set_override('connection', connection, group='database')
+
+    engine = sa_api.get_engine()
+    if args.connection and not args.force_drop:
+        if not connection.startswith('sqlite'):
+            sys.exit('Refusing to drop tables of a non-SQLite DB, use '
+                     '--force-drop to do it.')
+        if engine.table_names():
+            sys.exit('Refusing to drop tables of a non-empty DB, use '
+                     '--force-drop to do it.')
+
+    db_api.drop_db()
+    db_api.setup_db()
+    ctx = context.Context()
+    now = datetime.datetime.utcnow()
+
+    print('%10s %20s %20s' % ('rows', 'due events, ms', 'lease events, ms'))
+    rows = 0
+    size = 1000
+    while size <= args.max_rows:
+        lease_id = fill(engine, size - rows, now, args.undone_fraction)
+        rows = size
+
+        due = timeit.timeit(
+            lambda: db_api.event_get_all_sorted_by_filters(
+                ctx, 'time', 'asc', {'status': ['UNDONE'], 'time': now},
+                limit=100),
+            number=args.repeat)
+        by_lease = timeit.timeit(
+            lambda: db_api.event_get_all_sorted_by_filters(
+                ctx, 'time', 'asc', {'lease_id': lease_id,
+                                     'event_type': ['end_lease', 'notify']}),
+            number=args.repeat)
+
+        print('%10d %20.3f %20.3f' % (rows,
+                                      due * 1000 / args.repeat,
+                                      by_lease * 1000 / args.repeat))
+        size *= 10
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# Copyright (c) 2013 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure serialization time of lease lists rendered by climate-api.
+
+Usage:
+    python tools/benchmark_render.py [--max-leases N] [--repeat N]
+
+Compares the JSONDictSerializer used before with climate.utils.serializer
+and checks both produce the same JSON.
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from climate.openstack.common.deprecated import wsgi
+from climate.openstack.common import uuidutils
+from climate.utils import serializer
+
+EVENT_TYPES = ('start_lease', 'end_lease', 'notify')
+
+
+def make_leases(count, now):
+    """Return count leases as the manager returns them with two VMs."""
+    leases = []
+    for i in xrange(count):
+        lease_id = uuidutils.generate_uuid()
+        start = now + datetime.timedelta(minutes=i, microseconds=i)
+        end = start + datetime.timedelta(days=1)
+        leases.append({
+            'id': lease_id,
+            'name': 'lease-%d' % i,
+            'start_date': start,
+            'end_date': end,
+            'trust_id': uuidutils.generate_uuid(),
+            'tenant_id': 'tenant',
+            'user_id': 'user',
+            'status': 'UNDONE',
+            'created_at': now.isoformat(' '),
+            'updated_at': None,
+            'reservations': [{'id': uuidutils.generate_uuid(),
+                              'lease_id': lease_id,
+                              'resource_id': uuidutils.generate_uuid(),
+                              'resource_type': 'virtual:instance',
+                              'status': None}
+                             for _ in xrange(2)],
+            'events': [{'id': uuidutils.generate_uuid(),
+                        'lease_id': lease_id,
+                        'event_type': event_type,
+                        'time': start,
+                        'status': 'UNDONE'}
+                       for event_type in EVENT_TYPES],
+        })
+    return leases
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--max-leases', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    old_serializer = wsgi.JSONDictSerializer()
+    now = datetime.datetime.utcnow()
+
+    print('%10s %20s %20s' % ('leases', 'old, ms', 'new, ms'))
+    count = 10
+    while count <= args.max_leases:
+        data = {'leases': make_leases(count, now)}
+        assert old_serializer.serialize(data) == serializer.dumps(data)
+
+        # the best of several runs is the least disturbed by other load
+        old = min(timeit.repeat(lambda: old_serializer.serialize(data),
+                                number=args.repeat, repeat=5))
+        new = min(timeit.repeat(lambda: serializer.dumps(data),
+                                number=args.repeat, repeat=5))
+        print('%10d %20.3f %20.3f' % (count,
+                                      old * 1000 / args.repeat,
+                                      new * 1000 / args.repeat))
+        count *= 10
+
+
+if __name__ == '__main__':
+    main()